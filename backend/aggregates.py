@@ -0,0 +1,105 @@
+"""Constant-memory summaries of list data the scorer only aggregates.
+
+The fetch backends feed commits into a CommitStats as pages arrive, so the
+full commit objects never need to be kept, and report branches as a bare
+count. analyze_repository reads these instead of the raw lists.
+"""
+from datetime import datetime
+
+# analyze_repository looks at dates of the newest 30 commits and messages of the newest 20
+DATE_WINDOW = 30
+MESSAGE_WINDOW = 20
+RECENT_WINDOW = max(DATE_WINDOW, MESSAGE_WINDOW)
+
+
+class BranchCount:
+    """Stands in for the branch list, which the scorer only ever counts"""
+    __slots__ = ('total',)
+
+    def __init__(self, total):
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+
+class CommitStats:
+    """Streaming aggregate of a newest-first commit listing
+
+    `recent` keeps (sha, author date, good message) for the commits inside the
+    scoring windows, so newer commits can later be stacked on top with
+    prepend() without refetching the history.
+    """
+    __slots__ = ('count', 'dated', 'first_date', 'last_date', 'good_messages', 'recent', 'head_committed_at')
+
+    def __init__(self):
+        self.count = 0
+        self.dated = 0
+        self.first_date = None
+        self.last_date = None
+        self.good_messages = 0
+        self.recent = []
+        self.head_committed_at = None
+
+    @classmethod
+    def from_commits(cls, commits):
+        stats = cls()
+        for commit in commits:
+            stats.add(commit)
+        return stats
+
+    @classmethod
+    def from_recent(cls, count, recent, head_committed_at=None):
+        """Rebuild from a newest-first `recent` window and the total commit count"""
+        stats = cls()
+        for sha, date, good_message in recent[:RECENT_WINDOW]:
+            stats._fold(sha, date, good_message)
+        stats.count = count
+        stats.head_committed_at = head_committed_at
+        return stats
+
+    def add(self, commit):
+        """Fold one REST-shaped commit into the aggregate"""
+        if self.count == 0:
+            self.head_committed_at = (commit['commit'].get('committer') or {}).get('date')
+        if self.count >= RECENT_WINDOW:
+            self.count += 1
+            return
+        try:
+            date = commit['commit']['author']['date']
+        except:
+            date = None
+        message = commit['commit']['message']
+        good_message = len(message) > 20 and not message.startswith('Update ')
+        self._fold(commit.get('sha'), date, good_message)
+
+    def prepend(self, newer, limit):
+        """Stats for the commits in `newer` landed on top of these ones, counting at most `limit`"""
+        return CommitStats.from_recent(min(newer.count + self.count, limit), newer.recent + self.recent,
+                                       newer.head_committed_at)
+
+    def _fold(self, sha, date, good_message):
+        index = self.count
+        self.count += 1
+        self.recent.append((sha, date, good_message))
+
+        if index < DATE_WINDOW:
+            try:
+                parsed = datetime.strptime(date, '%Y-%m-%dT%H:%M:%SZ')
+            except:
+                parsed = None
+            if parsed is not None:
+                self.dated += 1
+                if self.first_date is None or parsed < self.first_date:
+                    self.first_date = parsed
+                if self.last_date is None or parsed > self.last_date:
+                    self.last_date = parsed
+
+        if index < MESSAGE_WINDOW and good_message:
+            self.good_messages += 1
+
+    def date_range_days(self):
+        """Days spanned by the dated commits in the window, or None if fewer than two"""
+        if self.dated < 2:
+            return None
+        return (self.last_date - self.first_date).days
@@ -0,0 +1,339 @@
+"""Repository analysis pipeline behind /api/analyze, without the web framework.
+
+Fetches a repository from GitHub, scores it, writes its summary and roadmap,
+caches the result by HEAD SHA and renders it in the requested response shape.
+app.py (Flask), asgi.py and serverless.py serve it; it imports nothing from
+the HTTP stack up front, so the serverless entry point starts fast.
+"""
+from datetime import datetime
+import json
+import os
+
+import metrics
+from aggregates import CommitStats
+from github_client import fetch_github_data, fetch_head_sha, parse_repo_url, response_cache, token_pool
+from responses import ResponseEncoder
+from result_cache import ResultCache, make_result_key
+from roadmap import ROADMAP_TEMPLATES, ROADMAP_TEMPLATES_VERSION, roadmap_ids, summary_and_roadmap
+from scoring_rules import classify_listing
+from tree_index import merge_signals
+
+# Bump whenever analyze_repository or generate_summary_and_roadmap output changes,
+# so results cached under the old rules are not served. bulk_scoring.score_columns
+# repeats analyze_repository's thresholds and must change with them
+SCORING_VERSION = '2'
+
+# Score tests/config/structure over the whole git tree rather than the root listing
+DEEP_ANALYSIS = os.environ.get('ANALYSIS_DEEP_MODE', '').lower() in ('1', 'true', 'yes')
+
+result_cache = ResultCache()
+
+def dump_json(payload):
+    """Serialize like Flask's JSON provider outside debug mode, so every server emits identical bytes"""
+    return (json.dumps(payload, ensure_ascii=True, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+encoded_responses = ResponseEncoder(dump_json)
+
+ROADMAP_TEMPLATES_PATH = '/api/roadmap/templates'
+ROADMAP_TEMPLATES_URL = f'{ROADMAP_TEMPLATES_PATH}?v={ROADMAP_TEMPLATES_VERSION}'
+
+FETCH_FAILED_MESSAGE = 'Failed to fetch repository data. Make sure the URL is valid and the repository is public.'
+
+def analyze_repository(github_data):
+    """Analyze repository and generate score with detailed metrics"""
+    repo_data = github_data['repo_data']
+    # Fetchers that stream commits hand over the aggregate; otherwise build it from the list
+    commit_stats = github_data.get('commit_stats') or CommitStats.from_commits(github_data['commits'])
+    languages = github_data['languages']
+    contents = github_data['contents']
+    branches = github_data['branches']
+    
+    # Initialize scoring components
+    scores = {}
+    
+    # Every file-listing signal comes from one pass over contents
+    listing = classify_listing(contents)
+    tree_signals = github_data.get('tree_signals')
+    if tree_signals:
+        # Deep mode: tests, config, contributing guide and folders anywhere in the tree count
+        listing = merge_signals(listing, tree_signals)
+    
+    # 1. Documentation Score (0-20 points)
+    doc_score = 0
+    has_readme = listing['has_readme']
+    readme_size = listing['readme_size']
+    
+    if has_readme:
+        doc_score += 10
+        if readme_size > 500:
+            doc_score += 5
+        if readme_size > 1500:
+            doc_score += 5
+    
+    has_license = listing['has_license']
+    if has_license:
+        doc_score += 3
+    
+    has_contributing = listing['has_contributing']
+    if has_contributing:
+        doc_score += 2
+    
+    scores['documentation'] = min(doc_score, 20)
+    
+    # 2. Project Structure Score (0-15 points)
+    structure_score = 0
+    file_count = listing['file_count']
+    
+    if file_count >= 5:
+        structure_score += 5
+    elif file_count >= 3:
+        structure_score += 3
+    
+    # Check for common good structure patterns
+    structure_matches = listing['structure_matches']
+    structure_score += min(structure_matches * 2, 10)
+    
+    scores['structure'] = min(structure_score, 15)
+    
+    # 3. Code Quality Score (0-20 points)
+    quality_score = 0
+    
+    # Language diversity
+    if len(languages) > 0:
+        quality_score += 5
+    if len(languages) > 2:
+        quality_score += 3
+    
+    # Check for test files
+    has_tests = listing['has_tests']
+    if has_tests:
+        quality_score += 7
+    
+    # Check for config files (eslint, prettier, etc.)
+    has_config = listing['has_config']
+    if has_config:
+        quality_score += 5
+    
+    scores['quality'] = min(quality_score, 20)
+    
+    # 4. Commit History Score (0-20 points)
+    commit_score = 0
+    commit_count = commit_stats.count
+    
+    if commit_count >= 10:
+        commit_score += 10
+    elif commit_count >= 5:
+        commit_score += 7
+    elif commit_count >= 3:
+        commit_score += 5
+    elif commit_count >= 1:
+        commit_score += 3
+    
+    # Check commit consistency
+    if commit_count > 1:
+        date_range = commit_stats.date_range_days()
+        
+        if date_range is not None:
+            # Check if commits span multiple days
+            if date_range > 30:
+                commit_score += 5
+            elif date_range > 7:
+                commit_score += 3
+            elif date_range > 1:
+                commit_score += 2
+    
+    # Check commit message quality
+    good_messages = commit_stats.good_messages
+    if good_messages > 10:
+        commit_score += 5
+    elif good_messages > 5:
+        commit_score += 3
+    
+    scores['commits'] = min(commit_score, 20)
+    
+    # 5. Version Control Best Practices (0-15 points)
+    vc_score = 0
+    
+    # Multiple branches
+    branch_count = len(branches)
+    if branch_count > 3:
+        vc_score += 7
+    elif branch_count > 1:
+        vc_score += 5
+    
+    # Check for .gitignore
+    has_gitignore = listing['has_gitignore']
+    if has_gitignore:
+        vc_score += 5
+    
+    # Check if repo has issues/PRs enabled
+    if not repo_data.get('has_issues', False):
+        vc_score -= 2
+    else:
+        vc_score += 3
+    
+    scores['version_control'] = max(min(vc_score, 15), 0)
+    
+    # 6. Activity & Maintenance Score (0-10 points)
+    activity_score = 0
+    
+    # Recent activity
+    if repo_data.get('updated_at'):
+        try:
+            last_update = datetime.strptime(repo_data['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
+            days_since_update = (datetime.utcnow() - last_update).days
+            
+            if days_since_update < 7:
+                activity_score += 5
+            elif days_since_update < 30:
+                activity_score += 4
+            elif days_since_update < 90:
+                activity_score += 3
+            elif days_since_update < 180:
+                activity_score += 2
+            elif days_since_update < 365:
+                activity_score += 1
+        except:
+            pass
+    
+    # Stars and forks (indicates community interest)
+    stars = repo_data.get('stargazers_count', 0)
+    if stars > 10:
+        activity_score += 3
+    elif stars > 5:
+        activity_score += 2
+    elif stars > 0:
+        activity_score += 1
+    
+    forks = repo_data.get('forks_count', 0)
+    if forks > 5:
+        activity_score += 2
+    elif forks > 0:
+        activity_score += 1
+    
+    scores['activity'] = min(activity_score, 10)
+    
+    # Calculate total score
+    total_score = sum(scores.values())
+    
+    return {
+        'total_score': total_score,
+        'breakdown': scores,
+        'metrics': {
+            'has_readme': has_readme,
+            'readme_size': readme_size,
+            'has_tests': has_tests,
+            'commit_count': commit_count,
+            'branch_count': branch_count,
+            'languages': list(languages.keys()),
+            'file_count': file_count,
+            'stars': repo_data.get('stargazers_count', 0),
+            'forks': repo_data.get('forks_count', 0),
+            'has_license': has_license,
+            'has_gitignore': has_gitignore,
+            **({'tree_entries': tree_signals['tree_entries'], 'tree_truncated': tree_signals['tree_truncated']}
+               if tree_signals else {})
+        }
+    }
+
+def generate_summary_and_roadmap(analysis_result):
+    """Generate human-readable summary and personalized roadmap"""
+    summary, roadmap = summary_and_roadmap(analysis_result)
+    
+    return {
+        'score': analysis_result['total_score'],
+        'summary': summary,
+        'roadmap': roadmap
+    }
+
+def run_analysis(repo_url, deep=False, head_sha=None):
+    """Fetch, score and summarize a repository; None if it couldn't be fetched"""
+    # Fetch GitHub data
+    with metrics.stage('fetch'):
+        github_data = fetch_github_data(repo_url, deep, head_sha)
+    
+    if not github_data:
+        return None
+    
+    return build_result(github_data)
+
+def build_result(github_data):
+    """Score and summarize fetched repository data into the API response"""
+    # Analyze repository
+    with metrics.stage('analyze'):
+        analysis_result = analyze_repository(github_data)
+    
+    # Generate summary and roadmap
+    with metrics.stage('summarize'):
+        result = generate_summary_and_roadmap(analysis_result)
+    
+    # Add metrics for transparency
+    result['metrics'] = analysis_result['metrics']
+    result['breakdown'] = analysis_result['breakdown']
+    
+    # Remove rating field to keep only numerical score
+    if 'rating' in result:
+        del result['rating']
+    
+    return result
+
+def cached_analysis(repo_url, deep=DEEP_ANALYSIS):
+    """run_analysis memoized on the repository's HEAD SHA and SCORING_VERSION"""
+    return keyed_analysis(repo_url, deep)[1]
+
+def keyed_analysis(repo_url, deep=DEEP_ANALYSIS):
+    """cached_analysis returning (result-cache key, result); the key is None for uncached results"""
+    parsed = parse_repo_url(repo_url)
+    if not parsed:
+        return None, None
+    
+    owner, repo = parsed
+    with metrics.stage('head_sha'):
+        head_sha = fetch_head_sha(owner, repo)
+    if not head_sha:
+        # Empty or inaccessible repo: nothing stable to key on
+        return None, run_analysis(repo_url, deep)
+    
+    key = make_result_key(owner, repo, head_sha, SCORING_VERSION, 'deep' if deep else 'root')
+    return key, result_cache.get_or_compute(key, lambda: run_analysis(repo_url, deep, head_sha))
+
+def compact_result(result):
+    """The analysis with roadmap items as ROADMAP_TEMPLATES ids, to be looked up client-side"""
+    return dict(result, roadmap=roadmap_ids(result['roadmap']), roadmap_templates=ROADMAP_TEMPLATES_URL)
+
+# Response shapes: 'full' repeats every roadmap text, 'compact' sends ids
+RESPONSE_SHAPES = {'full': lambda result: result, 'compact': compact_result}
+
+def analysis_params(data):
+    """(repo_url, deep, shape) from a JSON body or query string; ValueError for an unknown shape"""
+    deep = data.get('deep', DEEP_ANALYSIS)
+    if isinstance(deep, str):
+        deep = deep.lower() in ('1', 'true', 'yes')
+    shape = data.get('shape') or 'full'
+    if shape not in RESPONSE_SHAPES:
+        raise ValueError(f"shape must be one of: {', '.join(RESPONSE_SHAPES)}")
+    return data.get('repo_url', ''), bool(deep), shape
+
+def render_analysis(key, result, shape, accept_encoding, if_none_match):
+    """(status, headers, body) of an analysis in `shape`, compressed and tagged for revalidation"""
+    representation = key + (shape,) if key else None
+    return encoded_responses.respond(representation, result, RESPONSE_SHAPES[shape], accept_encoding, if_none_match)
+
+def templates_response(version, accept_encoding, if_none_match):
+    """(status, headers, body) of ROADMAP_TEMPLATES; immutable when requested by its current version"""
+    cache_control = 'public, max-age=31536000, immutable' if version == ROADMAP_TEMPLATES_VERSION else 'no-cache'
+    return encoded_responses.respond(('roadmap-templates', ROADMAP_TEMPLATES_VERSION), ROADMAP_TEMPLATES,
+                                     lambda templates: {'version': ROADMAP_TEMPLATES_VERSION, 'templates': templates},
+                                     accept_encoding, if_none_match, cache_control)
+
+def rate_limit_error(error):
+    return {'error': f'GitHub API rate limit reached. Please try again in {error.retry_after} seconds.'}
+
+def cache_status():
+    """Cache and rate-limit state reported by /api/health"""
+    return {
+        'github_cache': response_cache.stats(),
+        'result_cache': result_cache.stats(),
+        'response_cache': encoded_responses.stats(),
+        'rate_limit': token_pool.snapshot()
+    }
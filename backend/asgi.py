@@ -0,0 +1,329 @@
+"""ASGI entry point for production serving.
+
+/api/analyze and /api/health run natively on the event loop with non-blocking
+GitHub calls (async_github), so a process can hold thousands of analyses that
+are waiting on GitHub without a thread each. Every other route is served by
+the Flask app through a thread-backed WSGI bridge, so the response contract is
+the same in both modes.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as flask_app
+import async_github
+import metrics
+from github_client import parse_repo_url
+from jobs import parse_wait
+from rate_limiter import RateLimitError
+from result_cache import make_result_key
+
+ASGI_HOST = os.environ.get('ASGI_HOST', '0.0.0.0')
+ASGI_PORT = int(os.environ.get('ASGI_PORT', '5000'))
+# Threads available to routes served by the Flask app (e.g. batch streaming)
+WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', '32'))
+
+# Matches flask-cors' defaults; preflight OPTIONS requests go through the Flask app
+CORS_HEADERS = [(b'access-control-allow-origin', b'*')]
+TRACE_HEADER = metrics.TRACE_HEADER.lower().encode()
+
+
+async def run_analysis(repo_url, deep=False, head_sha=None):
+    """Async app.run_analysis"""
+    with metrics.stage('fetch'):
+        github_data = await async_github.fetch_github_data(repo_url, deep, head_sha)
+    if not github_data:
+        return None
+    return flask_app.build_result(github_data)
+
+
+async def cached_analysis(repo_url, deep=flask_app.DEEP_ANALYSIS):
+    """Async app.cached_analysis, sharing its result cache and in-flight analyses"""
+    return (await keyed_analysis(repo_url, deep))[1]
+
+
+async def keyed_analysis(repo_url, deep=flask_app.DEEP_ANALYSIS):
+    """Async app.keyed_analysis"""
+    parsed = parse_repo_url(repo_url)
+    if not parsed:
+        return None, None
+
+    owner, repo = parsed
+    with metrics.stage('head_sha'):
+        head_sha = await async_github.fetch_head_sha(owner, repo)
+    if not head_sha:
+        return None, await run_analysis(repo_url, deep)
+
+    key = make_result_key(owner, repo, head_sha, flask_app.SCORING_VERSION, 'deep' if deep else 'root')
+    return key, await flask_app.result_cache.get_or_compute_async(key, lambda: run_analysis(repo_url, deep, head_sha))
+
+
+def json_body(payload):
+    # Serialized by Flask's JSON provider, so both servers emit identical bytes
+    return flask_app.app.json.response(payload).get_data()
+
+
+async def send_json(send, payload, status=200, headers=()):
+    body = json_body(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            *CORS_HEADERS,
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_body(send, status, headers, body):
+    """Send a (status, headers, body) rendered by app.encoded_responses"""
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    if status != 304:
+        headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers + CORS_HEADERS})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def request_header(scope, name):
+    """Value of a request header (lowercase bytes name), '' when absent"""
+    for header, value in scope['headers']:
+        if header == name:
+            return value.decode('latin-1')
+    return ''
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def analyze(scope, receive, send):
+    if scope['method'] == 'GET':
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        data = {name: values[0] for name, values in query.items()}
+    else:
+        try:
+            data = json.loads(await read_body(receive) or b'null')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            await send_json(send, {'error': 'Request body must be a JSON object'}, 400)
+            return
+
+    try:
+        repo_url, deep, shape = flask_app.analysis_params(data)
+    except ValueError as e:
+        await send_json(send, {'error': str(e)}, 400)
+        return
+    if not repo_url:
+        await send_json(send, {'error': 'Repository URL is required'}, 400)
+        return
+
+    try:
+        key, result = await keyed_analysis(repo_url, deep)
+    except RateLimitError as e:
+        await send_json(send, flask_app.rate_limit_error(e), 429, [(b'retry-after', str(e.retry_after).encode())])
+        return
+
+    if not result:
+        await send_json(send, {'error': flask_app.FETCH_FAILED_MESSAGE}, 400)
+        return
+    if_none_match = request_header(scope, b'if-none-match') if scope['method'] == 'GET' else ''
+    await send_body(send, *flask_app.render_analysis(key, result, shape, request_header(scope, b'accept-encoding'),
+                                                    if_none_match))
+
+
+async def health(scope, receive, send):
+    await send_json(send, flask_app.health_status())
+
+
+async def job_status(scope, receive, send):
+    """Native long-poll: waiting for a job costs no thread"""
+    job_id = scope['path'][len(JOB_PATH):]
+    try:
+        timeout = parse_wait(parse_qs(scope.get('query_string', b'').decode('latin-1')).get('wait', [''])[0])
+    except ValueError:
+        await send_json(send, {'error': 'wait must be a number of seconds'}, 400)
+        return
+
+    job = flask_app.job_queue.get(job_id)
+    if job is None:
+        await send_json(send, {'error': 'Unknown or expired job'}, 404)
+        return
+    if not job.finished and timeout > 0:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except asyncio.TimeoutError:
+            pass
+    await send_json(send, job.to_dict())
+
+
+JOB_PATH = '/api/jobs/'
+
+# (method, path) -> (handler, endpoint label); job status paths are matched by prefix in route()
+ROUTES = {
+    ('POST', '/api/analyze'): (analyze, '/api/analyze'),
+    ('GET', '/api/analyze'): (analyze, '/api/analyze'),
+    ('GET', '/api/health'): (health, '/api/health'),
+}
+
+
+def route(scope):
+    """Return (handler, endpoint label) for a natively served request, or None"""
+    match = ROUTES.get((scope['method'], scope['path']))
+    if match is None and scope['method'] == 'GET' and scope['path'].startswith(JOB_PATH):
+        job_id = scope['path'][len(JOB_PATH):]
+        if job_id and '/' not in job_id:
+            match = (job_status, '/api/jobs/<job_id>')
+    return match
+
+
+async def instrumented(handler, endpoint, scope, receive, send):
+    """Run a native route with the request timing and trace header the Flask hooks give other routes"""
+    started = time.perf_counter()
+    trace_token = None
+    for name, value in scope['headers']:
+        if name == TRACE_HEADER and metrics.trace_requested(value.decode('latin-1')):
+            trace_token = metrics.start_trace()
+    response = {}
+
+    async def send_instrumented(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            if trace_token is not None:
+                timing = metrics.current_trace().server_timing()
+                message = dict(message, headers=[*message['headers'], (b'server-timing', timing.encode())])
+        else:
+            response['size'] = response.get('size', 0) + len(message.get('body', b''))
+        await send(message)
+
+    try:
+        await handler(scope, receive, send_instrumented)
+    finally:
+        if trace_token is not None:
+            metrics.end_trace(trace_token)
+        metrics.record_response(endpoint, response.get('status', 500), time.perf_counter() - started, response.get('size', 0))
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def call_wsgi(wsgi_app, scope, receive, send):
+    """Run a WSGI app in a worker thread, streaming its body chunks back as they are produced"""
+    environ = wsgi_environ(scope, await read_body(receive))
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    def produce():
+        try:
+            body = wsgi_app(environ, start_response)
+            try:
+                for chunk in body:
+                    if chunk:
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    worker = loop.run_in_executor(get_wsgi_executor(), produce)
+    chunk = await queue.get()
+    if 'status' not in started:
+        await worker  # the app failed before starting a response; let the server report it
+    await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+    while chunk is not None:
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        chunk = await queue.get()
+    await send({'type': 'http.response.body', 'body': b''})
+    await worker
+
+
+_wsgi_executor = None
+
+
+def get_wsgi_executor():
+    global _wsgi_executor
+    if _wsgi_executor is None:
+        _wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='wsgi')
+    return _wsgi_executor
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            async_github.get_session()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_github.close_session()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    match = route(scope)
+    if match is not None:
+        await instrumented(*match, scope, receive, send)
+    else:
+        await call_wsgi(flask_app.app.wsgi_app, scope, receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run('asgi:app', host=ASGI_HOST, port=ASGI_PORT, log_level='warning')
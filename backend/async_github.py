@@ -0,0 +1,236 @@
+"""Non-blocking counterpart of github_client for the ASGI server.
+
+Mirrors the REST and GraphQL fetch paths on an aiohttp ClientSession so a single
+event loop can keep thousands of analyses waiting on GitHub at once. It shares
+configuration, the conditional-request cache and the token pool with
+github_client, so both serving modes see the same quota and cached responses.
+"""
+import asyncio
+import json
+import time
+
+import aiohttp
+
+import github_client
+import github_graphql
+import metrics
+from aggregates import CommitStats
+from github_client import COMMIT_LIMIT, MAX_ATTEMPTS, PAGE_SIZE, PageCursor, last_page_number, parse_repo_url, with_params
+from rate_limiter import RateLimitError
+from snapshots import CommitChain
+
+_session = None
+
+
+class GitHubResponse:
+    """Fully read response with the requests.Response attributes the rest of the backend uses"""
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def get_session():
+    """Return the shared keep-alive ClientSession (must be used from one event loop)"""
+    global _session
+    if _session is None:
+        connect, read = github_client.REQUEST_TIMEOUT
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            # No cap on simultaneous connections: the token pool is what rations GitHub calls
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=0),
+            headers={'Accept': 'application/vnd.github+json'},
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def acquire_token():
+    """TokenPool.acquire without blocking the event loop while waiting for quota"""
+    pool = github_client.token_pool
+    deadline = time.time() + pool.max_wait
+    while True:
+        try:
+            return pool.acquire(max_wait=0)
+        except RateLimitError as e:
+            if time.time() + e.retry_after > deadline:
+                raise
+            await asyncio.sleep(min(e.retry_after, 1))
+
+
+async def github_request(method, url, headers=None, **kwargs):
+    """Async version of github_client.github_request"""
+    backoff = 0
+    for attempt in range(MAX_ATTEMPTS):
+        state = await acquire_token()
+        request_headers = dict(headers or {})
+        if state.token:
+            request_headers['Authorization'] = f'token {state.token}'
+        with metrics.github_call(url):
+            async with get_session().request(method, url, headers=request_headers, **kwargs) as raw:
+                response = GitHubResponse(raw.status, raw.headers, await raw.read())
+        metrics.record_github_bytes(url, response)
+        backoff = github_client.token_pool.record(state, response)
+        if backoff is None:
+            return response
+        print(f"GitHub rate limit on token {state.label}, backing off {backoff:.0f}s")
+    raise RateLimitError(backoff)
+
+
+async def get_page(url, default, headers=None):
+    """Async version of github_client.get_page, sharing its response cache"""
+    key, entry, page, request_headers = github_client.cache_lookup(url, headers)
+    if page is not None:
+        return page
+    return github_client.cache_response(key, entry, await github_request('GET', url, request_headers), default)
+
+
+async def get_json(url, default, headers=None):
+    return (await get_page(url, default, headers))[0]
+
+
+async def paginate(url, max_items=None, per_page=PAGE_SIZE, headers=None, until=None):
+    cursor = PageCursor(url, max_items, per_page, until)
+    while cursor.next_url:
+        for item in cursor.take(*await get_page(cursor.next_url, [], headers)):
+            yield item
+
+
+async def count_items(url, headers=None):
+    page, links = await get_page(with_params(url, per_page=1), [], headers)
+    return last_page_number(links, len(page))
+
+
+async def fetch_commit_stats(url, headers=None, listed=()):
+    stats = CommitStats.from_commits(listed)
+    if stats.count < COMMIT_LIMIT:
+        async for commit in paginate(url, max_items=COMMIT_LIMIT - stats.count, headers=headers):
+            stats.add(commit)
+    return stats
+
+
+async def fetch_head_sha(owner, repo):
+    headers = {'Accept': 'application/vnd.github.sha'}
+    try:
+        response = await github_request('GET', f'{github_client.GITHUB_API_URL}/repos/{owner}/{repo}/commits/HEAD', headers)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error fetching HEAD SHA: {e}")
+        return None
+    return response.text.strip() if response.status_code == 200 else None
+
+
+async def fetch_github_data(repo_url, deep=False, head_sha=None):
+    """Async version of github_client.fetch_github_data"""
+    parsed = parse_repo_url(repo_url)
+    if not parsed:
+        return None
+
+    owner, repo = parsed
+    # The streamed tree parser is synchronous; keep it off the event loop
+    tree_signals = asyncio.ensure_future(
+        asyncio.to_thread(github_client.fetch_tree_signals, owner, repo)
+    ) if deep else None
+    try:
+        if github_client.FETCH_MODE == 'graphql' and github_client.token_pool.authenticated:
+            github_data = await fetch_github_data_graphql(owner, repo)
+        else:
+            github_data = await fetch_github_data_rest(owner, repo, head_sha)
+        if github_data is not None and tree_signals is not None:
+            github_data['tree_signals'] = await tree_signals
+        return github_data
+    finally:
+        if tree_signals is not None and not tree_signals.done():
+            tree_signals.cancel()
+
+
+async def fetch_github_data_graphql(owner, repo):
+    try:
+        request = github_graphql.build_request(owner, repo, COMMIT_LIMIT)
+        response = await github_request('POST', github_client.graphql_url(), json=request)
+        if response.status_code != 200:
+            return None
+        return github_graphql.parse_response(response.json())
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Error fetching GitHub data: {e}")
+        return None
+
+
+async def fetch_github_data_rest(owner, repo, head_sha=None):
+    base_url = f'{github_client.GITHUB_API_URL}/repos/{owner}/{repo}'
+
+    try:
+        repo_data = await get_json(base_url, None)
+        if repo_data is None:
+            return None
+
+        snapshot = github_client.snapshot_store.get(owner, repo) if github_client.INCREMENTAL_ANALYSIS else None
+        if snapshot:
+            github_data = await fetch_changes(base_url, repo_data, snapshot, head_sha)
+        else:
+            commit_stats, languages, contents, branch_count = await asyncio.gather(
+                fetch_commit_stats(f'{base_url}/commits'),
+                get_json(f'{base_url}/languages', {}),
+                get_json(f'{base_url}/contents', []),
+                count_items(f'{base_url}/branches'),
+            )
+            github_data = github_client.github_data_of(repo_data, commit_stats, languages, contents, branch_count)
+        github_client.remember_snapshot(owner, repo, github_data)
+        return github_data
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Error fetching GitHub data: {e}")
+        return None
+
+
+async def list_new_commits(base_url, snapshot, head_sha=None):
+    """Async version of github_client.list_new_commits"""
+    chain = CommitChain(snapshot, head_sha, COMMIT_LIMIT)
+    if not chain.stopped:
+        chain.extend(await get_json(github_client.head_commit_url(base_url, head_sha), []))
+    if chain.wants_more():
+        url = github_client.new_commits_url(base_url, chain)
+        chain.extend([commit async for commit in paginate(url, COMMIT_LIMIT - len(chain.commits), until=chain.ends_at)])
+    return chain
+
+
+async def fetch_changes(base_url, repo_data, snapshot, head_sha=None):
+    """Async version of github_client.fetch_changes"""
+    chain, branch_count = await asyncio.gather(
+        list_new_commits(base_url, snapshot, head_sha),
+        count_items(f'{base_url}/branches'),
+    )
+    github_data = None
+    if chain.complete:
+        tree = languages = None
+        if chain.commits:
+            tree, languages = await asyncio.gather(
+                get_json(github_client.head_tree_url(base_url, chain.commits), None),
+                get_json(f'{base_url}/languages', {}),
+            )
+        github_data = github_client.apply_changes(repo_data, snapshot, chain.commits, tree, languages, branch_count)
+    if github_data is None:
+        commit_stats, languages, contents = await asyncio.gather(
+            fetch_commit_stats(github_client.history_url(base_url, chain), listed=chain.commits),
+            get_json(f'{base_url}/languages', {}),
+            get_json(f'{base_url}/contents', []),
+        )
+        github_data = github_client.github_data_of(repo_data, commit_stats, languages, contents, branch_count)
+    return github_data
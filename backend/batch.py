@@ -0,0 +1,127 @@
+"""Score many repositories in one go.
+
+Used by the /api/analyze/batch endpoint and runnable as a CLI:
+
+    python batch.py https://github.com/owner/a https://github.com/owner/b
+    python batch.py --org some-org --workers 16 > scores.ndjson
+    python batch.py --file urls.txt
+
+Results are emitted as NDJSON, one line per repository in completion order.
+"""
+import argparse
+import json
+import os
+import math
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from analysis import DEEP_ANALYSIS
+from github_client import COMMIT_LIMIT, FETCH_MODE, PAGE_SIZE, list_owner_repos, wait_for_quota
+
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '8'))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '32'))
+BATCH_MAX_REPOS = int(os.environ.get('BATCH_MAX_REPOS', '5000'))
+
+
+def calls_per_analysis(deep=False):
+    """Lower bound on the GitHub calls one analysis makes
+
+    HEAD lookup plus one GraphQL query or five REST fetches, the commits
+    spread over as many pages as COMMIT_LIMIT needs, and the git tree in deep
+    mode. Following a large commit range from a snapshot can take more.
+    """
+    fetches = 1 if FETCH_MODE == 'graphql' else 5 + math.ceil(COMMIT_LIMIT / PAGE_SIZE) - 1
+    return 1 + fetches + (1 if deep else 0)
+
+
+def _analyze_one(repo_url, analyze_fn, workers):
+    # Keep enough quota for every worker's next analysis before starting one; analyze_fn
+    # (cached_analysis) runs in deep mode when ANALYSIS_DEEP_MODE is on
+    wait_for_quota(calls_per_analysis(DEEP_ANALYSIS) * workers)
+    try:
+        result = analyze_fn(repo_url)
+    except Exception as e:
+        return {'repo_url': repo_url, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    if not result:
+        return {'repo_url': repo_url, 'ok': False, 'error': 'Failed to fetch repository data'}
+    return {'repo_url': repo_url, 'ok': True, 'result': result}
+
+
+def analyze_batch(repo_urls, analyze_fn, workers=BATCH_WORKERS):
+    """Yield one record per repository as its analysis completes
+
+    `repo_urls` may be any iterable (including a lazy org listing); at most
+    2 * `workers` repositories are in flight at once, so memory stays flat
+    regardless of batch size. Errors are reported per repository and never
+    abort the batch.
+    """
+    workers = max(1, min(workers, BATCH_MAX_WORKERS))
+    urls = iter(repo_urls)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                try:
+                    repo_url = next(urls)
+                except StopIteration:
+                    exhausted = True
+                except Exception as e:
+                    # The source itself failed (e.g. org listing); report and stop reading it
+                    exhausted = True
+                    yield {'repo_url': None, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+                else:
+                    pending.add(executor.submit(_analyze_one, repo_url, analyze_fn, workers))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def batch_source(repo_urls=None, org=None, limit=BATCH_MAX_REPOS):
+    """Iterate the repositories a batch request asks for, capped at `limit`"""
+    if org:
+        source = list_owner_repos(org)
+    else:
+        source = (url.strip() for url in repo_urls or [] if url and url.strip())
+    for count, repo_url in enumerate(source):
+        if count >= limit:
+            return
+        yield repo_url
+
+
+def to_ndjson(records):
+    for record in records:
+        yield json.dumps(record) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score GitHub repositories and print NDJSON results.')
+    parser.add_argument('repo_urls', nargs='*', help='repository URLs to analyze')
+    parser.add_argument('--org', help='analyze every public repository of this organization or user')
+    parser.add_argument('--file', help='read repository URLs from this file, one per line')
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    parser.add_argument('--limit', type=int, default=BATCH_MAX_REPOS)
+    args = parser.parse_args(argv)
+
+    repo_urls = list(args.repo_urls)
+    if args.file:
+        with open(args.file) as f:
+            repo_urls.extend(f)
+    if not repo_urls and not args.org:
+        parser.error('give repository URLs, --file or --org')
+
+    from app import cached_analysis
+
+    failures = 0
+    records = analyze_batch(batch_source(repo_urls, args.org, args.limit), cached_analysis, args.workers)
+    for record in records:
+        failures += not record['ok']
+        sys.stdout.write(json.dumps(record) + '\n')
+        sys.stdout.flush()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
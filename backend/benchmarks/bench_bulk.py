@@ -0,0 +1,127 @@
+"""Columnar bulk scoring against analyze_repository, one repository at a time.
+
+Builds random fetch results (listings, commit histories, branches, languages,
+repository metadata with valid, future, malformed and missing update times),
+checks bulk_scoring gives every one the same breakdown and total as
+analyze_repository, then compares throughput: the scalar scorer, bulk scoring
+of the same fetch results, bulk scoring of ready feature columns, and flat
+feature dumps scored from JSONL and Parquet to JSONL and Parquet (pyarrow is
+needed for the Parquet files).
+
+    python benchmarks/bench_bulk.py --repos 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow
+import pyarrow.parquet
+
+import bulk_scoring
+from app import analyze_repository
+from bench_scoring import NAME_POOL
+
+MESSAGES = ('Update README.md', 'fix', 'Add retry with backoff to the GitHub client', 'Refactor scoring rules table')
+
+
+def random_github_data(rng, index, now):
+    contents = [{'name': rng.choice(NAME_POOL), 'type': rng.choice(('file', 'dir')), 'size': rng.randint(0, 4000)}
+                for _ in range(rng.randint(0, 14))]
+    start = now - timedelta(days=rng.randint(0, 400))
+    commits = [{'sha': f'{index}-{number}',
+                'commit': {'author': {'date': (start - timedelta(hours=rng.randint(0, 2000))).strftime('%Y-%m-%dT%H:%M:%SZ')},
+                           'committer': {'date': start.strftime('%Y-%m-%dT%H:%M:%SZ')},
+                           'message': rng.choice(MESSAGES)}}
+               for number in range(rng.choice((0, 1, 2, 4, 6, 12, 40)))]
+    # Half a day off a day boundary, so both scorers see the same whole number of days
+    updated = now - timedelta(days=rng.randint(-3, 500), hours=12)
+    repo_data = {
+        'full_name': f'octo/repo-{index}',
+        'updated_at': rng.choice((updated.strftime('%Y-%m-%dT%H:%M:%SZ'),) * 8 + ('not a date', None)),
+        'stargazers_count': rng.randint(0, 20),
+        'forks_count': rng.randint(0, 8),
+    }
+    if rng.random() < 0.9:
+        repo_data['has_issues'] = rng.random() < 0.7
+    return {
+        'repo_data': repo_data,
+        'commits': commits,
+        'languages': {language: 100 for language in rng.sample(('Python', 'Go', 'C', 'Rust'), rng.randint(0, 4))},
+        'contents': contents,
+        'branches': [{'name': f'b{number}'} for number in range(rng.randint(0, 6))],
+    }
+
+
+def rate(count, seconds):
+    return f'{count / seconds:>12,.0f} repos/s'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    dataset = [random_github_data(rng, index, now) for index in range(args.repos)]
+
+    start = time.perf_counter()
+    scalar = [analyze_repository(github_data) for github_data in dataset]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = [bulk_scoring.normalize_row(github_data) for github_data in dataset]
+    columns = bulk_scoring.rows_to_columns(features)
+    scores = bulk_scoring.score_columns(columns, now)
+    bulk_seconds = time.perf_counter() - start
+
+    for index, result in enumerate(scalar):
+        bulk = {field: int(scores[field][index]) for field in result['breakdown']}
+        assert bulk == result['breakdown'], f'repo {index}: {bulk} != {result["breakdown"]}'
+        assert int(scores['total_score'][index]) == result['total_score'], f'repo {index}: total differs'
+    print(f'{args.repos} repositories: bulk scores match analyze_repository')
+
+    start = time.perf_counter()
+    bulk_scoring.score_columns(columns, now)
+    columns_seconds = time.perf_counter() - start
+
+    print(f"{'analyze_repository, one by one':<40} {rate(args.repos, scalar_seconds)}")
+    print(f"{'bulk, from fetch results':<40} {rate(args.repos, bulk_seconds)}")
+    print(f"{'bulk, score_columns only':<40} {rate(args.repos, columns_seconds)}")
+
+    expected = [result['total_score'] for result in scalar]
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl_dump = os.path.join(directory, 'features.jsonl')
+        with open(jsonl_dump, 'w') as f:
+            for record in features:
+                f.write(json.dumps(record) + '\n')
+        parquet_dump = os.path.join(directory, 'features.parquet')
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(features), parquet_dump)
+
+        for dump in (jsonl_dump, parquet_dump):
+            for output in ('scores.jsonl', 'scores.parquet'):
+                output = os.path.join(directory, output)
+                start = time.perf_counter()
+                count = bulk_scoring.score_file(dump, output, now)
+                seconds = time.perf_counter() - start
+                assert read_totals(output) == expected, f'{dump} -> {output}: totals differ'
+                label = f"feature {dump.rsplit('.', 1)[1]} -> {output.rsplit('.', 1)[1]}"
+                print(f"{label:<40} {rate(count, seconds)}")
+
+
+def read_totals(path):
+    if path.endswith('.parquet'):
+        return pyarrow.parquet.read_table(path, columns=['total_score']).column(0).to_pylist()
+    with open(path) as f:
+        return [json.loads(line)['total_score'] for line in f]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Cold start of the serverless entry point, checked against an import-time budget.
+
+Imports each module (serverless by default, app for comparison) in --runs
+fresh interpreters under `python -X importtime` and reports the median
+cumulative import time and the slowest imports under it. Then, against a
+GitHub stub, times a fresh process's first /api/analyze through serverless:app
+with and without warm_up() (run before the request, as the import-time
+warm-up thread would during the platform's init phase).
+
+Exits with status 1 if the median import of the first module exceeds
+--budget-ms, or the first request after warm-up exceeds --first-request-budget-ms:
+
+    python benchmarks/bench_cold_start.py --budget-ms 60
+    python benchmarks/bench_cold_start.py --modules serverless app asgi --latency 0.05
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from load_test import BACKEND, BENCHMARKS
+
+# Run in a fresh interpreter: import, optional warm-up, then one analysis through the WSGI callable
+FIRST_REQUEST = '''
+import io, json, sys, time
+started = time.perf_counter()
+import serverless
+imported = time.perf_counter()
+if sys.argv[1] == 'warm':
+    assert serverless.warm_up()
+warmed = time.perf_counter()
+body = json.dumps({'repo_url': 'https://github.com/octo/repo-0'}).encode()
+environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/api/analyze', 'CONTENT_LENGTH': str(len(body)),
+           'wsgi.input': io.BytesIO(body)}
+statuses = []
+b''.join(serverless.app(environ, lambda status, headers: statuses.append(status)))
+assert statuses == ['200 OK'], statuses
+done = time.perf_counter()
+print(json.dumps({'import': imported - started, 'warm_up': warmed - imported, 'first_request': done - warmed}))
+'''
+
+
+def environment(**extra):
+    # No warm-up thread during pure import timing; no result reuse between runs
+    env = dict(os.environ, SERVERLESS_WARM_UP='0', ANALYSIS_INCREMENTAL='0', GITHUB_TOKEN='', GITHUB_TOKENS='')
+    env.update(extra)
+    return env
+
+
+def import_times(module, runs):
+    """Median cumulative import time of `module` in ms, and (self ms, name) of its slowest imports"""
+    totals = []
+    selfs = {}
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=BACKEND,
+                                env=environment(), capture_output=True, text=True, check=True).stderr
+        # Lines after the header read "import time: <self us> | <cumulative us> | <indented name>",
+        # each module after the ones it imported; top-level imports are indented by one space
+        entries = [line.removeprefix('import time:').split('|') for line in output.splitlines()[1:]]
+        end = next(index for index, (_, _, name) in enumerate(entries) if name == f' {module}')
+        start = end
+        while start > 0 and entries[start - 1][2].startswith('   '):
+            start -= 1
+        for self_us, _, name in entries[start:end + 1]:
+            selfs.setdefault(name.strip(), []).append(int(self_us))
+        totals.append(int(entries[end][1]) / 1000)
+    slowest = sorted(((statistics.median(values) / 1000, name) for name, values in selfs.items()), reverse=True)
+    return statistics.median(totals), slowest
+
+
+def first_requests(stub_url, runs):
+    """Median seconds of each phase of a fresh process's first request, cold and after warm-up"""
+    phases = {}
+    for mode in ('cold', 'warm'):
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', FIRST_REQUEST, mode], cwd=BACKEND,
+                                    env=environment(GITHUB_API_URL=stub_url), capture_output=True, text=True,
+                                    check=True).stdout
+            samples.append(json.loads(output))
+        phases[mode] = {phase: statistics.median(sample[phase] for sample in samples) for phase in samples[0]}
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=['serverless', 'app'])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list per module')
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated GitHub latency per request in seconds')
+    parser.add_argument('--budget-ms', type=float, default=60.0,
+                        help='fail if importing the first module takes longer (median, -X importtime)')
+    parser.add_argument('--first-request-budget-ms', type=float,
+                        help='fail if the first request after warm-up takes longer (median)')
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        total, slowest = import_times(module, args.runs)
+        print(f"import {module:<12} {total:8.1f} ms")
+        for self_ms, name in slowest[:args.top]:
+            print(f"    {name:<40} {self_ms:6.1f} ms self")
+        if module == args.modules[0] and total > args.budget_ms:
+            over_budget.append(f'import {module} {total:.1f} ms > {args.budget_ms:.0f} ms')
+
+    stub = subprocess.Popen([sys.executable, os.path.join(BENCHMARKS, 'stub_github.py'), '--latency', str(args.latency),
+                             '--repos', '1'], stdout=subprocess.PIPE, text=True)
+    try:
+        phases = first_requests(stub.stdout.readline().strip(), args.runs)
+    finally:
+        stub.terminate()
+        stub.wait()
+    print(f"\nfirst request, stub latency {args.latency * 1000:.0f} ms")
+    for mode, timings in phases.items():
+        print(f"{mode:<6} import {timings['import'] * 1000:7.1f} ms   warm-up {timings['warm_up'] * 1000:7.1f} ms"
+              f"   first request {timings['first_request'] * 1000:7.1f} ms")
+    first_request_ms = phases['warm']['first_request'] * 1000
+    if args.first_request_budget_ms is not None and first_request_ms > args.first_request_budget_ms:
+        over_budget.append(f'first request {first_request_ms:.1f} ms > {args.first_request_budget_ms:.0f} ms')
+
+    if over_budget:
+        print('\nOVER BUDGET: ' + '; '.join(over_budget))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""End-to-end latency of fetch_github_data against a local GitHub stub.
+
+Compares the original sequential implementation (five un-pooled
+``requests.get`` calls, one after another) with the pooled, concurrent
+``github_client.fetch_github_data``, both cold (response cache cleared before
+every run) and warm (every call revalidated with a 304).
+
+    python benchmarks/bench_fetch.py --latency 0.05 --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+import github_client
+from stub_github import StubGitHubServer
+
+
+def sequential_fetch(base_url):
+    """The pre-pooling fetch path: a fresh connection per call, no concurrency"""
+    repo_response = requests.get(base_url)
+    if repo_response.status_code != 200:
+        return None
+    return {
+        'repo_data': repo_response.json(),
+        'commits': requests.get(f'{base_url}/commits').json()[:100],  # first page only: at most 30
+        'languages': requests.get(f'{base_url}/languages').json(),
+        'contents': requests.get(f'{base_url}/contents').json(),
+        'branches': requests.get(f'{base_url}/branches').json(),
+    }
+
+
+def measure(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+        assert result is not None
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+    print(f"{label:<12} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms   mean {statistics.mean(timings) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated per-request latency in seconds')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with StubGitHubServer(latency=args.latency) as server:
+        server.add_repo('octo', 'demo')
+        github_client.GITHUB_API_URL = server.url
+        github_client.INCREMENTAL_ANALYSIS = False  # measure full fetches, not snapshot updates
+
+        print(f"stub latency {args.latency * 1000:.0f} ms/request, {args.runs} runs")
+        report('sequential', measure(lambda: sequential_fetch(f'{server.url}/repos/octo/demo'), args.runs))
+
+        def cold_fetch():
+            github_client.response_cache.clear()
+            return github_client.fetch_github_data('https://github.com/octo/demo')
+
+        report('concurrent', measure(cold_fetch, args.runs))
+        report('revalidated', measure(lambda: github_client.fetch_github_data('https://github.com/octo/demo'), args.runs))
+        print('cache', github_client.response_cache.stats())
+
+
+if __name__ == '__main__':
+    main()
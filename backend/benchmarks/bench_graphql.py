@@ -0,0 +1,62 @@
+"""Payload bytes and latency of the REST and GraphQL fetch backends.
+
+Both backends are run against the same GitHub-shaped fixtures served by the
+local stub, and their scored output is compared so any divergence is visible.
+
+    python benchmarks/bench_graphql.py --latency 0.05 --runs 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_client
+from app import analyze_repository
+from stub_github import StubGitHubServer
+
+CORPUS = {
+    'small': dict(commit_count=8, file_count=6, branch_count=1),
+    'medium': dict(commit_count=30, file_count=40, branch_count=4),
+    'large': dict(commit_count=100, file_count=200, branch_count=30),
+}
+
+
+def run(server, fetch, owner, repo, runs):
+    timings, sizes, data = [], [], None
+    for _ in range(runs):
+        github_client.response_cache.clear()
+        server.reset_counters()
+        start = time.perf_counter()
+        data = fetch(owner, repo)
+        timings.append(time.perf_counter() - start)
+        sizes.append(server.bytes_sent)
+    return statistics.median(timings) * 1000, statistics.median(sizes), data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated per-request latency in seconds')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    with StubGitHubServer(latency=args.latency) as server:
+        github_client.GITHUB_API_URL = server.url
+        github_client.GITHUB_GRAPHQL_URL = ''
+        github_client.INCREMENTAL_ANALYSIS = False  # compare full fetches, not snapshot updates
+        print(f"stub latency {args.latency * 1000:.0f} ms/request, median of {args.runs} runs")
+        print(f"{'repo':<8} {'REST bytes':>11} {'GraphQL bytes':>14} {'ratio':>6}  {'REST ms':>8} {'GraphQL ms':>11}  same score")
+        for name, shape in CORPUS.items():
+            server.add_repo('bench', name, **shape)
+            rest_ms, rest_bytes, rest_data = run(server, github_client.fetch_github_data_rest, 'bench', name, args.runs)
+            gql_ms, gql_bytes, gql_data = run(server, github_client.fetch_github_data_graphql, 'bench', name, args.runs)
+            rest_score = analyze_repository(rest_data)
+            gql_score = analyze_repository(gql_data)
+            print(f"{name:<8} {rest_bytes:>11,.0f} {gql_bytes:>14,.0f} {rest_bytes / gql_bytes:>5.1f}x  "
+                  f"{rest_ms:>8.1f} {gql_ms:>11.1f}  {rest_score == gql_score}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""GitHub calls and bytes of an incremental re-analysis against a full one.
+
+Each scenario changes the stub repositories (nothing, a few new commits, new
+commits that add a root file, a merge commit, which forces the fallback, or a
+commit dated before the old HEAD, which a `since=` listing would miss), then
+re-analyzes every repository from its stored snapshot and again from scratch,
+checks both give the same result, and reports requests and bytes for each.
+The response cache is cleared before every run, as it would have expired
+between daily re-scores.
+
+    python benchmarks/bench_incremental.py --repos 20
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_client
+from app import run_analysis
+from stub_github import StubGitHubServer
+
+
+def push(server, names, count, files=()):
+    for name in names:
+        server.push_commits('octo', name, count, files)
+
+
+def merge(server, names):
+    """Land a merge commit (second parent from a side branch) on each repository"""
+    for name in names:
+        server.push_commits('octo', name, 1)
+        head = server.fixtures[f'/repos/octo/{name}/commits'][0]
+        head['parents'].append({'sha': 'e' * 40, 'url': '', 'html_url': ''})
+
+
+def backdate(server, names):
+    """Land a commit whose committer date is older than the previous HEAD's, as a rebase can"""
+    for name in names:
+        server.push_commits('octo', name, 1)
+        head = server.fixtures[f'/repos/octo/{name}/commits'][0]
+        head['commit'] = dict(head['commit'], committer=dict(head['commit']['committer'], date='2020-01-01T00:00:00Z'))
+
+
+SCENARIOS = (
+    ('unchanged', lambda server, names: None),
+    ('3 commits', lambda server, names: push(server, names, 3)),
+    ('3 commits + file', lambda server, names: push(server, names, 3, [('CONTRIBUTING.md', 700)])),
+    ('merge commit', merge),
+    ('backdated commit', backdate),
+)
+
+
+def analyze_all(server, names):
+    server.reset_counters()
+    results = []
+    for name in names:
+        github_client.response_cache.clear()
+        results.append(run_analysis(f'https://github.com/octo/{name}'))
+    return results, server.request_count, server.bytes_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=20)
+    args = parser.parse_args()
+
+    with StubGitHubServer() as server:
+        names = [f'repo-{index}' for index in range(args.repos)]
+        for name in names:
+            # Fewer commits than GITHUB_COMMIT_LIMIT, so a missed commit changes commit_count
+            server.add_repo('octo', name, commit_count=40)
+        github_client.GITHUB_API_URL = server.url
+        analyze_all(server, names)  # day 0: snapshots every repository
+
+        print(f"{'scenario':<18} {'full calls':>10} {'full KB':>9} {'incr calls':>10} {'incr KB':>9} {'bytes saved':>11}")
+        for label, change in SCENARIOS:
+            change(server, names)
+            incremental, incremental_calls, incremental_bytes = analyze_all(server, names)
+            github_client.snapshot_store.clear()
+            full, full_calls, full_bytes = analyze_all(server, names)
+            assert incremental == full, f'{label}: incremental result differs from full re-analysis'
+            print(f"{label:<18} {full_calls:>10} {full_bytes / 1024:>9.0f} {incremental_calls:>10} "
+                  f"{incremental_bytes / 1024:>9.0f} {full_bytes / max(incremental_bytes, 1):>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
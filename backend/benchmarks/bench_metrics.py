@@ -0,0 +1,80 @@
+"""Overhead of the metrics timers on the request path.
+
+Measures one stage() / github_call() timer with metrics disabled (the no-op
+path), enabled, and enabled with a trace active, next to a bare function call,
+then times a full uninstrumented vs instrumented fetch against the GitHub stub.
+
+    python benchmarks/bench_metrics.py --latency 0.02 --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_client
+import metrics
+from stub_github import StubGitHubServer
+
+URL = 'https://api.github.com/repos/octo/demo/commits?per_page=100'
+
+
+def per_call_ns(statement, number=200000):
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def timer_costs():
+    def stage():
+        with metrics.stage('analyze'):
+            pass
+
+    def github_call():
+        with metrics.github_call(URL):
+            pass
+
+    print(f"{'empty call':<28} {per_call_ns(lambda: None):8.0f} ns")
+    for enabled, traced in ((False, False), (True, False), (True, True)):
+        metrics.METRICS_ENABLED = enabled
+        token = metrics.start_trace() if traced else None
+        label = 'enabled' if enabled else 'disabled'
+        label += ' + trace' if traced else ''
+        print(f"{'stage() ' + label:<28} {per_call_ns(stage):8.0f} ns")
+        print(f"{'github_call() ' + label:<28} {per_call_ns(github_call):8.0f} ns")
+        if token is not None:
+            metrics.end_trace(token)
+
+
+def fetch_costs(runs):
+    def run():
+        timings = []
+        for _ in range(runs):
+            github_client.response_cache.clear()
+            start = time.perf_counter()
+            assert github_client.fetch_github_data('https://github.com/octo/demo') is not None
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        print(f"fetch, metrics {'enabled ' if enabled else 'disabled'}   p50 {run():8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated per-request latency in seconds')
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    timer_costs()
+    with StubGitHubServer(latency=args.latency) as server:
+        server.add_repo('octo', 'demo')
+        github_client.GITHUB_API_URL = server.url
+        github_client.INCREMENTAL_ANALYSIS = False  # measure full fetches, not snapshot updates
+        fetch_costs(args.runs)
+
+
+if __name__ == '__main__':
+    main()
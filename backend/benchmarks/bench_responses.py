@@ -0,0 +1,62 @@
+"""Bytes and server time per /api/analyze response, by shape and content coding.
+
+Analyzes a stub repository through the Flask app once, then for the full and
+compact shapes and each coding reports the body size and the time to answer
+a repeat view: rendered from scratch (serialize + compress every time, as
+before response caching), served from the encoded-response cache, and as a
+304 revalidation. The compact rows add the one-off roadmap templates fetch.
+
+    python benchmarks/bench_responses.py --runs 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_client
+from stub_github import StubGitHubServer
+
+REPO_URL = 'https://github.com/octo/demo'
+
+
+def per_call_us(function, runs):
+    return min(timeit.repeat(function, number=runs, repeat=5)) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+
+    with StubGitHubServer(latency=0) as server:
+        server.add_repo('octo', 'demo', commit_count=30)
+        github_client.GITHUB_API_URL = server.url
+        import app
+        import responses
+
+        key, result = app.keyed_analysis(REPO_URL)
+        encoder = app.encoded_responses
+        templates = app.templates_response(app.ROADMAP_TEMPLATES_VERSION, 'br, gzip', '')[2]
+        encodings = [('identity', '')] + [(encoding, encoding) for encoding in reversed(responses.ENCODINGS)]
+
+        print(f"{'shape':<8} {'coding':<9} {'bytes':>7} {'render us':>10} {'cached us':>10} {'304 us':>8}")
+        for shape in app.RESPONSE_SHAPES:
+            for label, accept in encodings:
+                status, headers, body = app.render_analysis(key, result, shape, accept, '')
+                etag = dict(headers)['ETag']
+
+                def uncached():
+                    encoder.clear()
+                    app.render_analysis(key, result, shape, accept, '')
+
+                cached = per_call_us(lambda: app.render_analysis(key, result, shape, accept, ''), args.runs)
+                revalidated = per_call_us(lambda: app.render_analysis(key, result, shape, accept, etag), args.runs)
+                print(f"{shape:<8} {label:<9} {len(body):>7} {per_call_us(uncached, args.runs // 10):>10.1f}"
+                      f" {cached:>10.1f} {revalidated:>8.1f}")
+        print(f"roadmap templates, fetched once per version: {len(templates)} bytes ({responses.ENCODINGS[0]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Per-analysis cost of the file-listing rules over large synthetic listings.
+
+Compares the original one-scan-per-rule checks of analyze_repository with the
+compiled single-pass classifier in scoring_rules, and verifies both produce
+identical signals on every listing (including randomized, adversarial names).
+
+    python benchmarks/bench_scoring.py --sizes 10000 50000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring_rules import classify_listing
+
+NAME_POOL = [
+    'README.md', 'readme.MD', 'ΣΑΣ', 'README.mdx', 'src/x', 'README.rst', 'LICENSE', 'license-mit.txt', 'LICENCE', 'CONTRIBUTING.md',
+    'contributing.RST', 'CONTRIBUTING.txt', 'test_app.py', 'Spectrum.js', 'inspect.py', 'setup.py',
+    'my-package.json', 'Package.json', '.eslintrc.json', '.prettierrc', 'tsconfig.json', '.gitignore',
+    '.GITIGNORE', 'src', 'SRC', 'Tests', 'docs', 'lib', 'config', 'public', 'assets', 'vendor', 'build',
+]
+
+
+def baseline_signals(contents):
+    """The listing checks exactly as analyze_repository performed them before the rule table"""
+    has_readme = any(file.get('name', '').lower() == 'readme.md' for file in contents)
+    readme_size = next((file.get('size', 0) for file in contents if file.get('name', '').lower() == 'readme.md'), 0)
+    has_license = any(file.get('name', '').lower().startswith('license') for file in contents)
+    has_contributing = any(file.get('name', '').lower() in ['contributing.md', 'contributing.rst'] for file in contents)
+    common_folders = ['src', 'tests', 'docs', 'lib', 'config', 'public', 'assets']
+    folder_names = [file.get('name', '').lower() for file in contents if file.get('type') == 'dir']
+    structure_matches = sum(1 for folder in common_folders if folder in folder_names)
+    has_tests = any('test' in file.get('name', '').lower() or 'spec' in file.get('name', '').lower() for file in contents)
+    config_files = ['.eslintrc', '.prettierrc', 'tsconfig.json', 'pytest.ini', 'setup.py', 'requirements.txt', 'package.json']
+    has_config = any(any(cf in file.get('name', '') for cf in config_files) for file in contents)
+    has_gitignore = any(file.get('name', '') == '.gitignore' for file in contents)
+    return {
+        'has_readme': has_readme,
+        'readme_size': readme_size,
+        'has_license': has_license,
+        'has_contributing': has_contributing,
+        'has_tests': has_tests,
+        'has_config': has_config,
+        'has_gitignore': has_gitignore,
+        'file_count': len(contents),
+        'structure_matches': structure_matches,
+    }
+
+
+def plain_listing(size):
+    """Mostly unremarkable files, signals at the end: the worst case for both implementations"""
+    contents = [{'name': f'module_{i}.js', 'type': 'file', 'size': 100 + i} for i in range(size)]
+    contents[-3:] = [
+        {'name': 'README.md', 'type': 'file', 'size': 2000},
+        {'name': 'src', 'type': 'dir', 'size': 0},
+        {'name': '.gitignore', 'type': 'file', 'size': 10},
+    ]
+    return contents
+
+
+def random_listing(rng, size):
+    contents = []
+    for i in range(size):
+        name = rng.choice(NAME_POOL) if rng.random() < 0.3 else f'file_{rng.randrange(10 ** 6)}.txt'
+        entry = {'name': name, 'type': rng.choice(['file', 'dir']), 'size': rng.randrange(3000)}
+        if rng.random() < 0.02:
+            del entry['size']
+        contents.append(entry)
+    return contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--checks', type=int, default=2000, help='randomized listings to cross-check')
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    for _ in range(args.checks):
+        contents = random_listing(rng, rng.randrange(0, 40))
+        assert classify_listing(contents) == baseline_signals(contents), contents
+    print(f"{args.checks} randomized listings: signals identical")
+
+    print(f"{'entries':>8} {'baseline ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        contents = plain_listing(size)
+        assert classify_listing(contents) == baseline_signals(contents)
+        runs = max(3, 200000 // size)
+        baseline = min(timeit.repeat(lambda: baseline_signals(contents), number=runs, repeat=3)) / runs
+        compiled = min(timeit.repeat(lambda: classify_listing(contents), number=runs, repeat=3)) / runs
+        print(f"{size:>8} {baseline * 1000:>12.2f} {compiled * 1000:>12.2f} {baseline / compiled:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Memory and time of indexing a recursive git tree, streamed versus parsed whole.
+
+The naive approach json.loads the full trees response and keeps the entry
+dicts; tree_index decodes entries one at a time into a compact PathIndex.
+Peak Python allocations are measured with tracemalloc, excluding the raw
+response bytes (which the streaming path never holds in full).
+
+    python benchmarks/bench_tree.py --sizes 100000 300000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tree_index
+from stub_github import make_tree
+
+CHUNK = 64 * 1024
+
+
+def measure(fn):
+    """(result, seconds, peak bytes); timed separately since tracing slows allocation down"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 300000])
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    print(f"{'entries':>8} {'body MB':>8} {'json.loads MB':>14} {'streamed MB':>12} {'index MB':>9} "
+          f"{'json.loads s':>13} {'streamed s':>11}  truncated")
+    for size in args.sizes:
+        body = json.dumps(make_tree(size)).encode()
+        chunks = lambda: (body[i:i + CHUNK] for i in range(0, len(body), CHUNK))
+
+        naive, naive_s, naive_peak = measure(lambda: json.loads(body)['tree'])
+        del naive
+        index, stream_s, stream_peak = measure(lambda: tree_index.build_index(chunks()))
+        signals = tree_index.tree_signals(index)
+        assert signals['has_tests'] and signals['has_contributing']
+
+        print(f"{size:>8} {len(body) / mb:>8.1f} {naive_peak / mb:>14.1f} {stream_peak / mb:>12.1f} "
+              f"{index.memory_bytes() / mb:>9.1f} {naive_s:>13.2f} {stream_s:>11.2f}  {index.truncated}")
+
+
+if __name__ == '__main__':
+    main()
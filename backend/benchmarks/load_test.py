@@ -0,0 +1,131 @@
+"""Throughput and latency of POST /api/analyze under concurrent load.
+
+Starts a GitHub stub and then, one after the other, the current threaded Flask
+server and the ASGI server (uvicorn asgi:app), each as a subprocess pointed at
+the stub. Both are driven with the same number of concurrent clients over
+distinct repositories, with the analysis cache disabled, so every request pays
+the full GitHub round-trips.
+
+    python benchmarks/load_test.py --latency 0.05 --concurrency 200 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+import requests
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(BACKEND, 'benchmarks')
+
+SERVERS = {
+    'flask': "import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)",
+    'asgi': "import uvicorn; uvicorn.run('asgi:app', host='127.0.0.1', port={port}, log_level='warning')",
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(args):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS, 'stub_github.py'),
+         '--latency', str(args.latency), '--repos', str(args.repos), '--commits', str(args.commits)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    return process, process.stdout.readline().strip()
+
+
+def start_server(name, stub_url, **extra_env):
+    port = free_port()
+    env = dict(os.environ, GITHUB_API_URL=stub_url, ANALYSIS_CACHE_SIZE='0', ANALYSIS_INCREMENTAL='0', GITHUB_TOKEN='', GITHUB_TOKENS='')
+    env.update(extra_env)
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVERS[name].format(port=port)],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{url}/api/health').status_code == 200:
+                return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{name} server did not start')
+
+
+async def drive(url, args):
+    """Send args.requests analyses with args.concurrency in flight; return (latencies, errors, elapsed)"""
+    latencies = []
+    errors = 0
+    counter = iter(range(args.requests))
+
+    async with aiohttp.ClientSession(url, connector=aiohttp.TCPConnector(limit=0)) as session:
+        async def worker():
+            nonlocal errors
+            for index in counter:
+                payload = {'repo_url': f'https://github.com/octo/repo-{index % args.repos}'}
+                start = time.perf_counter()
+                try:
+                    async with session.post('/api/analyze', json=payload) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except aiohttp.ClientError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+
+def report(name, latencies, errors, elapsed):
+    latencies.sort()
+    if not latencies:
+        print(f"{name:<6} all {errors} requests failed")
+        return
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{name:<6} {len(latencies) / elapsed:8.1f} req/s   p50 {p50:8.1f} ms   p99 {p99:8.1f} ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated GitHub latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repos', type=int, default=500, help='distinct repositories to spread requests over')
+    parser.add_argument('--commits', type=int, default=30, help='commits per stub repository')
+    parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['flask', 'asgi'])
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub(args)
+    print(f"stub latency {args.latency * 1000:.0f} ms/request, {args.concurrency} concurrent clients, {args.requests} requests")
+    try:
+        for name in args.servers:
+            server, url = start_server(name, stub_url)
+            try:
+                report(name, *asyncio.run(drive(url, args)))
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == '__main__':
+    main()
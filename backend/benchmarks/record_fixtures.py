@@ -0,0 +1,119 @@
+"""Record the GitHub responses an analysis needs, for offline replay.
+
+Runs a recording proxy in front of the GitHub API, points github_client at
+it and analyzes each repository the way /api/analyze does (HEAD lookup, then
+the full fetch; --deep adds the recursive tree, --graphql the GraphQL query).
+Every request and its response (status, Link and Content-Type headers, body
+text exactly as sent) is saved per repository to <out>/<owner>__<repo>.json.gz,
+which stub_github.py replays with --fixtures and suite.py with --fixtures.
+Link URLs are stored with the API base replaced by a placeholder, so replayed
+pagination points back at whichever stub serves them.
+
+    GITHUB_TOKEN=... python benchmarks/record_fixtures.py octocat/Hello-World pallets/flask --out fixtures
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+import github_client
+from app import run_analysis
+from stub_github import API_PLACEHOLDER, StubGitHubServer, canonical_query
+
+# Request headers passed through to GitHub; conditional ones are dropped so every body is recorded
+FORWARDED_HEADERS = ('Accept', 'Authorization', 'X-GitHub-Api-Version')
+RECORDED_HEADERS = ('Content-Type', 'Link')
+
+
+class RecordingProxy(StubGitHubServer):
+    """Forwards every request to `upstream` and keeps what came back"""
+
+    def __init__(self, upstream, graphql_upstream=None, **kwargs):
+        super().__init__(**kwargs)
+        self.upstream = upstream.rstrip('/')
+        self.graphql_upstream = graphql_upstream or f'{self.upstream}/graphql'
+        self.session = requests.Session()
+        self.responses = []
+        self._record_lock = threading.Lock()
+
+    def respond(self, path, query, headers):
+        url = f'{self.upstream}{path}' + (f'?{query}' if query else '')
+        response = self.session.get(url, headers=self.forwarded(headers))
+        return self.keep({'method': 'GET', 'path': path, 'query': canonical_query(query)}, response)
+
+    def respond_graphql(self, request_body, headers):
+        response = self.session.post(self.graphql_upstream, json=request_body, headers=self.forwarded(headers))
+        return self.keep({'method': 'POST', 'path': '/graphql', 'request_body': request_body}, response)
+
+    def forwarded(self, headers):
+        return {name: headers[name] for name in FORWARDED_HEADERS if headers.get(name)}
+
+    def keep(self, request, response):
+        recorded = {name: response.headers[name].replace(self.upstream, API_PLACEHOLDER)
+                    for name in RECORDED_HEADERS if name in response.headers}
+        with self._record_lock:
+            self.responses.append(dict(request, status=response.status_code, headers=recorded, body=response.text))
+        # Live pagination has to come back through the proxy too
+        live = {name: value.replace(API_PLACEHOLDER, self.url) for name, value in recorded.items()}
+        return response.status_code, live, response.text
+
+    def take(self):
+        with self._record_lock:
+            responses, self.responses = self.responses, []
+        return responses
+
+
+def record(proxy, repository, deep=False, graphql=False):
+    """Analyze one owner/repo through the proxy; returns its recording"""
+    owner, repo = repository.split('/')
+    repo_url = f'https://github.com/{owner}/{repo}'
+    github_client.response_cache.clear()
+    proxy.take()
+    github_client.fetch_head_sha(owner, repo)
+    result = run_analysis(repo_url, deep)
+    if graphql:
+        github_client.fetch_github_data_graphql(owner, repo)
+    return {
+        'repository': repository,
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'upstream': proxy.upstream,
+        'deep': deep,
+        'score': result['score'] if result else None,
+        'responses': proxy.take(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('repositories', nargs='+', help='owner/repo (or GitHub URL) of each repository to record')
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+    parser.add_argument('--upstream', default='https://api.github.com')
+    parser.add_argument('--deep', action='store_true', help='also record the recursive git tree')
+    parser.add_argument('--graphql', action='store_true', help='also record the GraphQL query (needs GITHUB_TOKEN)')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    with RecordingProxy(args.upstream) as proxy:
+        github_client.GITHUB_API_URL = proxy.url
+        github_client.GITHUB_GRAPHQL_URL = f'{proxy.url}/graphql'
+        github_client.INCREMENTAL_ANALYSIS = False  # record full fetches, not snapshot updates
+        for repository in args.repositories:
+            repository = repository.rstrip('/').removeprefix('https://github.com/')
+            recording = record(proxy, repository, args.deep, args.graphql)
+            path = os.path.join(args.out, repository.replace('/', '__') + '.json.gz')
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump(recording, f)
+            size = sum(len(response['body']) for response in recording['responses'])
+            print(f"{repository:<40} {len(recording['responses']):>4} responses {size / 1024:>9.0f} KB"
+                  f"   score {recording['score']}   -> {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,548 @@
+"""Local stand-in for api.github.com used by the benchmarks.
+
+Serves synthetic repository data with a configurable per-request latency so
+the fetch path can be measured offline and reproducibly. Point the backend at
+it by setting GITHUB_API_URL (or patching github_client.GITHUB_API_URL).
+
+REST fixtures mirror the shape and verbosity of real GitHub responses (full
+commit objects, user objects, URL templates), so byte counts measured against
+the stub are representative. POST /graphql answers the repository query from
+github_graphql using the same fixtures.
+
+Responses recorded from the real API by record_fixtures.py can be replayed
+too (add_recording / --fixtures): a recorded request is answered exactly as
+GitHub answered it, body bytes and pagination included.
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API = 'https://api.github.com'
+FIXTURE_EPOCH = 1735646400  # 2024-12-31T12:00:00Z, date of commit 0
+
+# List endpoints GitHub paginates (30 items per page unless per_page says otherwise)
+PAGINATED_SUFFIXES = ('/commits', '/branches', '/repos')
+
+# Stands for the API base URL in recorded Link headers
+API_PLACEHOLDER = '{api}'
+
+# Synthetic repositories of different sizes, served as corpus/<name> (see add_corpus)
+SYNTHETIC_CORPUS = {
+    'small': {'commit_count': 6, 'file_count': 7, 'branch_count': 1},
+    'medium': {'commit_count': 100, 'file_count': 40, 'branch_count': 6},
+    'large': {'commit_count': 400, 'file_count': 800, 'branch_count': 150, 'tree_size': 20000},
+}
+
+
+def make_user(login, user_id):
+    return {
+        'login': login,
+        'id': user_id,
+        'node_id': f'MDQ6VXNlcj{user_id:08d}',
+        'avatar_url': f'https://avatars.githubusercontent.com/u/{user_id}?v=4',
+        'gravatar_id': '',
+        'url': f'{API}/users/{login}',
+        'html_url': f'https://github.com/{login}',
+        'followers_url': f'{API}/users/{login}/followers',
+        'following_url': f'{API}/users/{login}/following{{/other_user}}',
+        'gists_url': f'{API}/users/{login}/gists{{/gist_id}}',
+        'starred_url': f'{API}/users/{login}/starred{{/owner}}{{/repo}}',
+        'subscriptions_url': f'{API}/users/{login}/subscriptions',
+        'organizations_url': f'{API}/users/{login}/orgs',
+        'repos_url': f'{API}/users/{login}/repos',
+        'events_url': f'{API}/users/{login}/events{{/privacy}}',
+        'received_events_url': f'{API}/users/{login}/received_events',
+        'type': 'User',
+        'site_admin': False,
+    }
+
+
+def make_commit(owner, repo, index, author):
+    sha = hashlib.sha1(f'{owner}/{repo}/{index}'.encode()).hexdigest()
+    parent = hashlib.sha1(f'{owner}/{repo}/{index + 1}'.encode()).hexdigest()
+    base = f'{API}/repos/{owner}/{repo}'
+    # Newest first, six hours apart; negative indexes are commits pushed later (see push_commits)
+    date = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(FIXTURE_EPOCH - index * 6 * 3600))
+    message = (f'Update file_{index}.js' if index % 4 == 3
+               else f'feat(core): implement feature number {index} with tests')
+    person = {'name': author['login'], 'email': f"{author['login']}@example.com", 'date': date}
+    return {
+        'sha': sha,
+        'node_id': f'C_kwDO{sha[:20]}',
+        'commit': {
+            'author': person,
+            'committer': person,
+            'message': message,
+            'tree': {'sha': sha[::-1], 'url': f'{base}/git/trees/{sha[::-1]}'},
+            'url': f'{base}/git/commits/{sha}',
+            'comment_count': 0,
+            'verification': {'verified': False, 'reason': 'unsigned', 'signature': None, 'payload': None},
+        },
+        'url': f'{base}/commits/{sha}',
+        'html_url': f'https://github.com/{owner}/{repo}/commit/{sha}',
+        'comments_url': f'{base}/commits/{sha}/comments',
+        'author': author,
+        'committer': author,
+        'parents': [{'sha': parent, 'url': f'{base}/commits/{parent}', 'html_url': f'https://github.com/{owner}/{repo}/commit/{parent}'}],
+    }
+
+
+def make_content(owner, repo, name, entry_type, size):
+    base = f'{API}/repos/{owner}/{repo}'
+    sha = hashlib.sha1(f'{owner}/{repo}/{name}'.encode()).hexdigest()
+    git_url = f"{base}/git/{'trees' if entry_type == 'dir' else 'blobs'}/{sha}"
+    html_url = f"https://github.com/{owner}/{repo}/{'tree' if entry_type == 'dir' else 'blob'}/main/{name}"
+    return {
+        'name': name,
+        'path': name,
+        'sha': sha,
+        'size': size,
+        'url': f'{base}/contents/{name}?ref=main',
+        'html_url': html_url,
+        'git_url': git_url,
+        'download_url': None if entry_type == 'dir' else f'https://raw.githubusercontent.com/{owner}/{repo}/main/{name}',
+        'type': entry_type,
+        '_links': {'self': f'{base}/contents/{name}?ref=main', 'git': git_url, 'html': html_url},
+    }
+
+
+def make_repo(owner, repo, owner_user):
+    base = f'{API}/repos/{owner}/{repo}'
+    data = {
+        'id': abs(hash((owner, repo))) % 10 ** 9,
+        'node_id': 'R_kgDOExample',
+        'name': repo,
+        'full_name': f'{owner}/{repo}',
+        'private': False,
+        'owner': owner_user,
+        'html_url': f'https://github.com/{owner}/{repo}',
+        'description': f'Synthetic fixture repository {owner}/{repo}',
+        'fork': False,
+        'url': base,
+        'homepage': None,
+        'size': 2048,
+        'stargazers_count': 42,
+        'watchers_count': 42,
+        'language': 'JavaScript',
+        'has_issues': True,
+        'has_projects': True,
+        'has_downloads': True,
+        'has_wiki': True,
+        'has_pages': False,
+        'has_discussions': False,
+        'forks_count': 7,
+        'archived': False,
+        'disabled': False,
+        'open_issues_count': 3,
+        'license': {'key': 'mit', 'name': 'MIT License', 'spdx_id': 'MIT', 'url': f'{API}/licenses/mit', 'node_id': 'MDc6TGljZW5zZTEz'},
+        'allow_forking': True,
+        'is_template': False,
+        'topics': ['demo', 'fixture'],
+        'visibility': 'public',
+        'forks': 7,
+        'open_issues': 3,
+        'watchers': 42,
+        'default_branch': 'main',
+        'network_count': 7,
+        'subscribers_count': 4,
+        'created_at': '2023-01-01T00:00:00Z',
+        'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'pushed_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'clone_url': f'https://github.com/{owner}/{repo}.git',
+        'git_url': f'git://github.com/{owner}/{repo}.git',
+        'ssh_url': f'git@github.com:{owner}/{repo}.git',
+        'svn_url': f'https://github.com/{owner}/{repo}',
+    }
+    for name in ('forks', 'keys', 'collaborators', 'teams', 'hooks', 'issue_events', 'events', 'assignees',
+                 'branches', 'tags', 'blobs', 'git_tags', 'git_refs', 'trees', 'statuses', 'languages',
+                 'stargazers', 'contributors', 'subscribers', 'subscription', 'commits', 'git_commits',
+                 'comments', 'issue_comment', 'contents', 'compare', 'merges', 'archive', 'downloads',
+                 'issues', 'pulls', 'milestones', 'notifications', 'labels', 'releases', 'deployments'):
+        data[f'{name}_url'] = f'{base}/{name}'
+    return data
+
+
+def make_repo_fixture(owner, repo, commit_count=100, file_count=20, branch_count=5):
+    """Build the JSON bodies GitHub would return for one repository"""
+    owner_user = make_user(owner, 1000)
+    author = make_user(f'{owner}-dev', 2000)
+    commits = [make_commit(owner, repo, i, author) for i in range(commit_count)]
+
+    entries = [
+        ('README.md', 'file', 2400),
+        ('LICENSE', 'file', 1000),
+        ('.gitignore', 'file', 100),
+        ('package.json', 'file', 800),
+        ('src', 'dir', 0),
+        ('tests', 'dir', 0),
+        ('docs', 'dir', 0),
+    ]
+    entries += [(f'module_{i}.js', 'file', 500) for i in range(max(file_count - len(entries), 0))]
+    contents = [make_content(owner, repo, name, entry_type, size) for name, entry_type, size in entries]
+
+    head = commits[0] if commits else None
+    branches = [
+        {
+            'name': name,
+            'commit': {'sha': head['sha'] if head else '', 'url': head['url'] if head else ''},
+            'protected': name == 'main',
+        }
+        for name in ['main'] + [f'feature/{i}' for i in range(branch_count - 1)]
+    ]
+
+    base = f'/repos/{owner}/{repo}'
+    return {
+        base: make_repo(owner, repo, owner_user),
+        f'{base}/commits': commits,
+        f'{base}/commits/HEAD': head['sha'] if head else None,
+        f'{base}/languages': {'JavaScript': 12000, 'CSS': 3000, 'HTML': 800},
+        f'{base}/contents': contents,
+        f'{base}/branches': branches,
+    }
+
+
+def make_root_tree(contents):
+    """The non-recursive git tree matching a /contents root listing"""
+    tree = []
+    for entry in contents:
+        is_dir = entry['type'] == 'dir'
+        item = {'path': entry['name'], 'mode': '040000' if is_dir else '100644', 'type': 'tree' if is_dir else 'blob',
+                'sha': entry['sha'], 'url': entry['git_url']}
+        if not is_dir:
+            item['size'] = entry['size']
+        tree.append(item)
+    return {'sha': hashlib.sha1(json.dumps(tree).encode()).hexdigest(), 'url': '', 'tree': tree, 'truncated': False}
+
+
+def make_tree(entry_count, truncated=False):
+    """A recursive git tree of roughly `entry_count` entries, monorepo style
+
+    Tests live only below packages/*/, never at the root, so only a deep
+    analysis can find them.
+    """
+    tree = []
+
+    def add(path, entry_type, size=None):
+        entry = {'path': path, 'mode': '040000' if entry_type == 'tree' else '100644', 'type': entry_type,
+                 'sha': hashlib.sha1(path.encode()).hexdigest(), 'url': f'{API}/repos/x/y/git/blobs/{path}'}
+        if size is not None:
+            entry['size'] = size
+        tree.append(entry)
+
+    for name, size in (('README.md', 2400), ('LICENSE', 1000), ('.gitignore', 100)):
+        add(name, 'blob', size)
+    add('.github', 'tree')
+    add('.github/CONTRIBUTING.md', 'blob', 900)
+    add('packages', 'tree')
+    package = 0
+    while len(tree) < entry_count:
+        base = f'packages/pkg{package}'
+        add(base, 'tree')
+        add(f'{base}/package.json', 'blob', 600)
+        add(f'{base}/src', 'tree')
+        add(f'{base}/test', 'tree')
+        for i in range(20):
+            add(f'{base}/src/module_{i}.ts', 'blob', 1200 + i)
+            add(f'{base}/test/module_{i}.test.ts', 'blob', 800 + i)
+        package += 1
+    return {'sha': 'f' * 40, 'url': f'{API}/repos/x/y/git/trees/{"f" * 40}', 'tree': tree, 'truncated': truncated}
+
+
+def graphql_repository(fixtures, owner, repo, commit_limit=100):
+    """Answer github_graphql.REPOSITORY_QUERY from the REST fixtures"""
+    base = f'/repos/{owner}/{repo}'
+    repo_data = fixtures.get(base)
+    if repo_data is None:
+        return None
+    commits = fixtures.get(f'{base}/commits', [])
+    entry_types = {'file': 'blob', 'dir': 'tree', 'submodule': 'commit'}
+    return {
+        'hasIssuesEnabled': repo_data['has_issues'],
+        'updatedAt': repo_data['updated_at'],
+        'stargazerCount': repo_data['stargazers_count'],
+        'forkCount': repo_data['forks_count'],
+        'languages': {'edges': [
+            {'size': size, 'node': {'name': name}}
+            for name, size in sorted(fixtures[f'{base}/languages'].items(), key=lambda item: -item[1])
+        ]},
+        'refs': {'totalCount': len(fixtures.get(f'{base}/branches', []))},
+        'object': {'entries': [
+            {'name': c['name'], 'type': entry_types[c['type']],
+             'object': {'byteSize': c['size']} if c['type'] == 'file' else {}}
+            for c in fixtures[f'{base}/contents']
+        ]},
+        'defaultBranchRef': {'target': {'history': {'nodes': [
+            {'message': c['commit']['message'], 'author': {'date': c['commit']['author']['date']}}
+            for c in commits[:commit_limit]
+        ]}}},
+    }
+
+
+def canonical_query(query):
+    """Query string with parameters in a fixed order, so recorded requests match regardless of order"""
+    return '&'.join(sorted(part for part in query.split('&') if part))
+
+
+def graphql_key(request_body):
+    """Identifies a GraphQL request by its query and variables"""
+    return hashlib.sha1(json.dumps(request_body, sort_keys=True).encode()).hexdigest()
+
+
+def recording_key(method, path, query='', request_body=None):
+    if method == 'POST':
+        return method, path, graphql_key(request_body)
+    return method, path, canonical_query(query)
+
+
+def load_recordings(directory):
+    """Every recording (see record_fixtures.py) saved in `directory`, by file name"""
+    recordings = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json.gz')) + glob.glob(os.path.join(directory, '*.json'))):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            recordings.append(json.load(f))
+    return recordings
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+
+
+class StubGitHubServer:
+    """Threaded HTTP server answering GitHub REST paths from an in-memory fixture table"""
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.fixtures = {}
+        self.recorded = {}
+        self.pushed = {}
+        self.unmatched = set()
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = StubHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def add_repo(self, owner, repo, tree_size=None, tree_truncated=False, **kwargs):
+        self.fixtures.update(make_repo_fixture(owner, repo, **kwargs))
+        if tree_size:
+            self.fixtures[f'/repos/{owner}/{repo}/git/trees/HEAD'] = make_tree(tree_size, tree_truncated)
+
+    def add_corpus(self, corpus=SYNTHETIC_CORPUS, owner='corpus'):
+        """Add the synthetic corpus; returns the repository URLs"""
+        for name, sizes in corpus.items():
+            self.add_repo(owner, name, **sizes)
+        return [f'https://github.com/{owner}/{name}' for name in corpus]
+
+    def add_recording(self, recording):
+        """Replay the responses of one recorded repository; returns its URL"""
+        for response in recording['responses']:
+            key = recording_key(response['method'], response['path'], response.get('query', ''),
+                                response.get('request_body'))
+            self.recorded[key] = response
+        return f"https://github.com/{recording['repository']}"
+
+    def replay(self, key):
+        """(status, headers, body) of a recorded response, or None"""
+        response = self.recorded.get(key)
+        if response is None:
+            return None
+        headers = {name: value.replace(API_PLACEHOLDER, self.url) for name, value in response['headers'].items()}
+        return response['status'], headers, response['body']
+
+    def push_commits(self, owner, repo, count, files=()):
+        """Land `count` new commits on the default branch, optionally adding root files as (name, size)"""
+        base = f'/repos/{owner}/{repo}'
+        commits = self.fixtures[f'{base}/commits']
+        author = commits[0]['author'] if commits else make_user(f'{owner}-dev', 2000)
+        pushed_before = self.pushed.get(base, 0)
+        pushed = [make_commit(owner, repo, -(pushed_before + i), author) for i in range(count, 0, -1)]
+        self.pushed[base] = pushed_before + count
+        self.fixtures[f'{base}/commits'] = pushed + commits
+        self.fixtures[f'{base}/commits/HEAD'] = pushed[0]['sha']
+        contents = self.fixtures[f'{base}/contents'] + [
+            make_content(owner, repo, name, 'file', size) for name, size in files
+        ]
+        self.fixtures[f'{base}/contents'] = contents
+        self.fixtures[f"{base}/git/trees/{pushed[0]['commit']['tree']['sha']}"] = make_root_tree(contents)
+        self.fixtures[base] = dict(self.fixtures[base], updated_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.not_modified_count = 0
+            self.bytes_sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, path, query, headers):
+        """Return (status, extra_headers, body) for a GET; override to customise"""
+        replayed = self.replay(recording_key('GET', path, query))
+        if replayed is not None:
+            return replayed
+        body = self.fixtures.get(path)
+        if body is None:
+            with self._lock:
+                self.unmatched.add(f'GET {path}?{query}' if query else f'GET {path}')
+            return 404, {}, {'message': 'Not Found'}
+        if isinstance(body, list) and path.endswith(PAGINATED_SUFFIXES):
+            params = parse_qs(query)
+            sha, since = params.get('sha'), params.get('since')
+            if sha and path.endswith('/commits'):
+                # History is linear here: listing from a commit is the tail of the list starting at it
+                position = next((index for index, commit in enumerate(body) if commit['sha'] == sha[0]), None)
+                if position is None:
+                    return 404, {}, {'message': f'No commit found for SHA: {sha[0]}'}
+                body = body[position:]
+            if since and path.endswith('/commits'):
+                # ISO 8601 UTC timestamps compare correctly as strings
+                body = [commit for commit in body if commit['commit']['committer']['date'] >= since[0]]
+            return self.paginate(path, query, body)
+        return 200, {}, body
+
+    def paginate(self, path, query, items):
+        """Serve one page of `items` with a GitHub-style Link header"""
+        params = parse_qs(query)
+        per_page = min(int(params.get('per_page', ['30'])[0]), 100)
+        page = max(int(params.get('page', ['1'])[0]), 1)
+        last = max((len(items) + per_page - 1) // per_page, 1)
+        extra = ''.join(f'&{name}={values[0]}' for name, values in params.items() if name not in ('per_page', 'page'))
+
+        def page_url(number):
+            return f'{self.url}{path}?per_page={per_page}{extra}&page={number}'
+
+        links = []
+        if page < last:
+            links += [f'<{page_url(page + 1)}>; rel="next"', f'<{page_url(last)}>; rel="last"']
+        if page > 1:
+            links += [f'<{page_url(1)}>; rel="first"', f'<{page_url(page - 1)}>; rel="prev"']
+        headers = {'Link': ', '.join(links)} if links else {}
+        return 200, headers, items[(page - 1) * per_page:page * per_page]
+
+    def respond_graphql(self, request_body, headers):
+        """Return (status, extra_headers, body) for a POST /graphql"""
+        replayed = self.replay(recording_key('POST', '/graphql', request_body=request_body))
+        if replayed is not None:
+            return replayed
+        variables = request_body.get('variables') or {}
+        repository = graphql_repository(self.fixtures, variables.get('owner'), variables.get('name'),
+                                        variables.get('commits', 100))
+        if repository is None:
+            return 200, {}, {'data': {'repository': None}, 'errors': [{'type': 'NOT_FOUND', 'message': 'Could not resolve to a Repository'}]}
+        return 200, {}, {'data': {'repository': repository}}
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._begin()
+                parts = urlsplit(self.path)
+                status, extra_headers, body = stub.respond(parts.path.rstrip('/'), parts.query, self.headers)
+                self._send(status, extra_headers, body, validate=True)
+
+            def do_POST(self):
+                self._begin()
+                length = int(self.headers.get('Content-Length') or 0)
+                request_body = json.loads(self.rfile.read(length) or b'{}')
+                if urlsplit(self.path).path.rstrip('/') != '/graphql':
+                    self._send(404, {}, {'message': 'Not Found'})
+                    return
+                status, extra_headers, body = stub.respond_graphql(request_body, self.headers)
+                self._send(status, extra_headers, body)
+
+            def _begin(self):
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+            def _send(self, status, extra_headers, body, validate=False):
+                if isinstance(body, str):
+                    payload = body.encode()  # e.g. the bare SHA of application/vnd.github.sha
+                else:
+                    payload = b'' if body is None else json.dumps(body).encode()
+                if status == 200 and validate:
+                    # Validate like GitHub does so conditional requests can be exercised
+                    etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+                    extra_headers = dict(extra_headers, ETag=etag)
+                    if self.headers.get('If-None-Match') == etag:
+                        with stub._lock:
+                            stub.not_modified_count += 1
+                        status, payload = 304, b''
+                with stub._lock:
+                    stub.bytes_sent += len(payload)
+                extra_headers = dict(extra_headers)
+                content_type = extra_headers.pop('Content-Type', 'application/json; charset=utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic GitHub repositories octo/repo-0..N-1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated per-request latency in seconds')
+    parser.add_argument('--repos', type=int, default=1)
+    parser.add_argument('--commits', type=int, default=100)
+    parser.add_argument('--corpus', action='store_true', help='also serve the synthetic corpus as corpus/<size>')
+    parser.add_argument('--fixtures', help='also replay the recordings saved in this directory')
+    args = parser.parse_args()
+
+    server = StubGitHubServer(latency=args.latency, port=args.port)
+    for index in range(args.repos):
+        server.add_repo('octo', f'repo-{index}', commit_count=args.commits)
+    if args.corpus:
+        server.add_corpus()
+    if args.fixtures:
+        for recording in load_recordings(args.fixtures):
+            server.add_recording(recording)
+    print(server.url, flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""Offline benchmark suite with saved baselines and regression thresholds.
+
+Serves a corpus of repositories from a GitHub stub subprocess: recordings
+made with record_fixtures.py (--fixtures), or by default the synthetic
+small/medium/large corpus of stub_github.py. It then measures:
+
+- e2e.<repo>.*: POST /api/analyze latency per repository against the Flask
+  server (a subprocess, analysis and response caches off, so every request
+  fetches everything), sequentially;
+- e2e.*: throughput and latency with --concurrency clients over the corpus,
+  and the server's peak RSS (Linux);
+- cpu.<stage>.<repo>: CPU time of each pipeline stage (head_sha, fetch,
+  analyze, summarize), in this process, fetch threads included;
+- memory.<stage>.<repo>: peak Python allocations of each stage (tracemalloc).
+
+--save writes the results to a JSON baseline. --compare checks a run against
+one and exits with status 1 if a metric got worse by more than its threshold,
+given pytest-benchmark style as --compare-fail GLOB:PERCENT% (the last
+matching pattern wins, '*:20%' by default):
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --compare baseline.json --compare-fail '*:20%' --compare-fail 'memory.*:5%'
+    python benchmarks/suite.py --fixtures benchmarks/fixtures --latency 0.05
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+import github_client
+from app import analyze_repository, generate_summary_and_roadmap
+from load_test import BENCHMARKS, start_server
+from stub_github import SYNTHETIC_CORPUS, load_recordings
+
+LOWER, HIGHER = 'lower', 'higher'
+DEFAULT_COMPARE_FAIL = '*:20%'
+
+
+class Results:
+    """Named measurements, each with a unit and which direction is better"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better=LOWER):
+        self.metrics[name] = {'value': round(value, 3), 'unit': unit, 'better': better}
+        print(f'{name:<44} {value:>12.2f} {unit}', flush=True)
+
+    def to_json(self, args):
+        return {
+            'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+            'params': {'latency': args.latency, 'rounds': args.rounds, 'concurrency': args.concurrency,
+                       'requests': args.requests, 'fixtures': args.fixtures, 'deep': args.deep},
+            'metrics': self.metrics,
+        }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def start_stub(args):
+    command = [sys.executable, os.path.join(BENCHMARKS, 'stub_github.py'), '--latency', str(args.latency),
+               '--repos', '0']
+    command += ['--fixtures', args.fixtures] if args.fixtures else ['--corpus']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def corpus(args):
+    """(label, repository URL) for every repository served"""
+    if args.fixtures:
+        repositories = [recording['repository'] for recording in load_recordings(args.fixtures)]
+    else:
+        repositories = [f'corpus/{name}' for name in SYNTHETIC_CORPUS]
+    return [(repository.split('/')[-1], f'https://github.com/{repository}') for repository in repositories]
+
+
+def peak_rss_mib(pid):
+    """High-water resident set size of a process, or None where /proc isn't available"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def bench_e2e(results, stub_url, repositories, args):
+    server, url = start_server('flask', stub_url, GITHUB_CACHE_SIZE_MB='0')
+    session = requests.Session()
+
+    def analyze(repo_url):
+        start = time.perf_counter()
+        response = session.post(f'{url}/api/analyze', json={'repo_url': repo_url, 'deep': args.deep})
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200, f'{repo_url}: {response.status_code} {response.text[:200]}'
+        return elapsed
+
+    try:
+        for label, repo_url in repositories:
+            analyze(repo_url)  # warm-up: imports, connection pools
+            timings = [analyze(repo_url) for _ in range(args.rounds)]
+            results.add(f'e2e.{label}.p50_ms', statistics.median(timings) * 1000, 'ms')
+            results.add(f'e2e.{label}.mean_ms', statistics.mean(timings) * 1000, 'ms')
+
+        urls = [repo_url for _, repo_url in repositories] * (args.requests // len(repositories) + 1)
+        urls = urls[:args.requests]
+
+        def client_analyze(repo_url):
+            with requests.Session() as client:
+                start = time.perf_counter()
+                response = client.post(f'{url}/api/analyze', json={'repo_url': repo_url, 'deep': args.deep})
+                assert response.status_code == 200, f'{repo_url}: {response.status_code}'
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            timings = list(executor.map(client_analyze, urls))
+        elapsed = time.perf_counter() - start
+        results.add('e2e.throughput_rps', len(timings) / elapsed, 'req/s', HIGHER)
+        results.add('e2e.p50_ms', statistics.median(timings) * 1000, 'ms')
+        results.add('e2e.p99_ms', percentile(timings, 0.99) * 1000, 'ms')
+        rss = peak_rss_mib(server.pid)
+        if rss is not None:
+            results.add('e2e.server_peak_rss_mib', rss, 'MiB')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def pipeline_stages(repo_url, deep):
+    """The stages of cached_analysis + run_analysis + build_result, as (name, callable) run in order"""
+    owner, repo = github_client.parse_repo_url(repo_url)
+    state = {}
+    return [
+        ('head_sha', lambda: github_client.fetch_head_sha(owner, repo)),
+        ('fetch', lambda: state.update(github_data=github_client.fetch_github_data(repo_url, deep))),
+        ('analyze', lambda: state.update(analysis=analyze_repository(state['github_data']))),
+        ('summarize', lambda: generate_summary_and_roadmap(state['analysis'])),
+    ]
+
+
+def bench_stages(results, stub_url, repositories, args):
+    github_client.GITHUB_API_URL = stub_url
+    github_client.INCREMENTAL_ANALYSIS = False  # full fetches, like the server measured above
+    for label, repo_url in repositories:
+        cpu = {}
+        for _ in range(args.rounds + 1):
+            github_client.response_cache.clear()
+            for name, run in pipeline_stages(repo_url, args.deep):
+                start = time.process_time()
+                run()
+                cpu.setdefault(name, []).append(time.process_time() - start)
+        for name, timings in cpu.items():
+            # The first round pays for imports and connection set-up
+            results.add(f'cpu.{name}.{label}_ms', statistics.median(timings[1:]) * 1000, 'ms')
+
+        github_client.response_cache.clear()
+        tracemalloc.start()
+        try:
+            for name, run in pipeline_stages(repo_url, args.deep):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                run()
+                results.add(f'memory.{name}.{label}_kib', (tracemalloc.get_traced_memory()[1] - baseline) / 1024, 'KiB')
+        finally:
+            tracemalloc.stop()
+
+
+def parse_compare_fail(specs):
+    """[(glob, fraction)] from GLOB:PERCENT% specs"""
+    rules = []
+    for spec in specs:
+        pattern, _, percent = spec.rpartition(':')
+        if not pattern or not percent.endswith('%'):
+            raise ValueError(f'Expected GLOB:PERCENT%, got {spec!r}')
+        rules.append((pattern, float(percent[:-1]) / 100))
+    return rules
+
+
+def compare(metrics, baseline, rules):
+    """Print each metric against the baseline; return the names that regressed past their threshold"""
+    regressions = []
+    print(f"\n{'metric':<44} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, metric in metrics.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        threshold = next((fraction for pattern, fraction in reversed(rules) if fnmatch.fnmatch(name, pattern)), None)
+        change = (metric['value'] - before['value']) / before['value'] if before['value'] else 0.0
+        worse = change if metric['better'] == LOWER else -change
+        failed = threshold is not None and worse > threshold
+        if failed:
+            regressions.append(name)
+        print(f"{name:<44} {before['value']:>12.2f} {metric['value']:>12.2f} {change * 100:>+7.1f}%"
+              + (f'   REGRESSION (> {threshold * 100:.0f}%)' if failed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', help='replay the recordings in this directory instead of the synthetic corpus')
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated GitHub latency per request in seconds')
+    parser.add_argument('--rounds', type=int, default=10, help='measured runs per repository')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--deep', action='store_true', help='analyze the whole git tree (recordings need --deep too)')
+    parser.add_argument('--only', choices=('e2e', 'stages'), help='run one group of benchmarks')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file from an earlier --save')
+    parser.add_argument('--compare-fail', action='append', default=[], metavar='GLOB:PERCENT%',
+                        help=f'fail when a matching metric is worse by more than PERCENT (default {DEFAULT_COMPARE_FAIL.replace("%", "%%")})')
+    args = parser.parse_args()
+
+    try:
+        rules = parse_compare_fail(args.compare_fail or [DEFAULT_COMPARE_FAIL])
+    except ValueError as e:
+        parser.error(str(e))
+
+    repositories = corpus(args)
+    stub, stub_url = start_stub(args)
+    results = Results()
+    try:
+        if args.only in (None, 'e2e'):
+            bench_e2e(results, stub_url, repositories, args)
+        if args.only in (None, 'stages'):
+            bench_stages(results, stub_url, repositories, args)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results.to_json(args), f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['metrics']
+        regressions = compare(results.metrics, baseline, rules)
+        if regressions:
+            print(f'\n{len(regressions)} metrics regressed: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
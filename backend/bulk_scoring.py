@@ -0,0 +1,356 @@
+"""Columnar scoring of many repositories from exported metadata.
+
+Scores the same six breakdown components as analyze_repository, with the
+same thresholds, but over NumPy arrays holding one feature per column, so a
+dump of tens of thousands of repositories is scored with a few dozen array
+operations instead of one Python call per repository. Input is JSONL or
+Parquet (Parquet needs pyarrow), read and scored BULK_CHUNK_ROWS rows at a
+time, and the scores are written the same way:
+
+    python bulk_scoring.py repos.jsonl -o scores.parquet
+    python bulk_scoring.py repos.parquet --now 2024-06-01T00:00:00Z > scores.jsonl
+
+Each input row is either a flat feature record (FEATURES below; absent
+features count as missing, e.g. no README) or a fetch result with
+`repo_data`, `commits`, `languages`, `contents` and `branches`, as
+fetch_github_data returns it, which is reduced to features on load. ID_FIELDS
+present in a row are copied to its output row.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from aggregates import CommitStats
+from scoring_rules import classify_listing
+from tree_index import merge_signals
+
+BULK_CHUNK_ROWS = int(os.environ.get('BULK_CHUNK_ROWS', '65536'))
+
+# Feature columns and their dtypes; date_range_days is -1 when fewer than two commits are dated
+FEATURES = (
+    ('has_readme', np.bool_),
+    ('readme_size', np.int64),
+    ('has_license', np.bool_),
+    ('has_contributing', np.bool_),
+    ('file_count', np.int64),
+    ('structure_matches', np.int64),
+    ('language_count', np.int64),
+    ('has_tests', np.bool_),
+    ('has_config', np.bool_),
+    ('commit_count', np.int64),
+    ('date_range_days', np.int64),
+    ('good_messages', np.int64),
+    ('branch_count', np.int64),
+    ('has_gitignore', np.bool_),
+    ('has_issues', np.bool_),
+    ('updated_at', np.int64),
+    ('stars', np.int64),
+    ('forks', np.int64),
+)
+
+ID_FIELDS = ('repo_url', 'full_name', 'id')
+SCORE_FIELDS = ('total_score', 'documentation', 'structure', 'quality', 'commits', 'version_control', 'activity')
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+CANONICAL_DATE = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ')
+EPOCH = datetime(1970, 1, 1)
+DAY_MICROSECONDS = 86400 * 1000000
+# updated_at of a row whose timestamp is missing or malformed (analyze_repository gives it no recency points)
+NO_UPDATE = np.iinfo(np.int64).min
+
+
+def update_seconds(value):
+    """Seconds since the epoch of an `updated_at` string as analyze_repository parses it, or NO_UPDATE"""
+    if isinstance(value, datetime):
+        # Parquet timestamp columns
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return int((value - EPOCH).total_seconds())
+    if not isinstance(value, str):
+        return NO_UPDATE
+    try:
+        if CANONICAL_DATE.fullmatch(value):
+            # Several times faster than strptime, and the same result for this exact shape
+            return int((datetime.fromisoformat(value[:-1]) - EPOCH).total_seconds())
+    except ValueError:
+        pass
+    try:
+        return int((datetime.strptime(value, DATE_FORMAT) - EPOCH).total_seconds())
+    except ValueError:
+        return NO_UPDATE
+
+
+def features_from_github_data(github_data):
+    """The feature record analyze_repository would score a fetch result on"""
+    repo_data = github_data['repo_data']
+    commit_stats = github_data.get('commit_stats') or CommitStats.from_commits(github_data['commits'])
+    listing = classify_listing(github_data['contents'])
+    tree_signals = github_data.get('tree_signals')
+    if tree_signals:
+        listing = merge_signals(listing, tree_signals)
+    date_range = commit_stats.date_range_days()
+    return {
+        'full_name': repo_data.get('full_name'),
+        'has_readme': listing['has_readme'],
+        'readme_size': listing['readme_size'],
+        'has_license': listing['has_license'],
+        'has_contributing': listing['has_contributing'],
+        'file_count': listing['file_count'],
+        'structure_matches': listing['structure_matches'],
+        'language_count': len(github_data['languages']),
+        'has_tests': listing['has_tests'],
+        'has_config': listing['has_config'],
+        'commit_count': commit_stats.count,
+        'date_range_days': -1 if date_range is None else date_range,
+        'good_messages': commit_stats.good_messages,
+        'branch_count': len(github_data['branches']),
+        'has_gitignore': listing['has_gitignore'],
+        'has_issues': repo_data.get('has_issues', False),
+        'updated_at': repo_data.get('updated_at'),
+        'stars': repo_data.get('stargazers_count', 0),
+        'forks': repo_data.get('forks_count', 0),
+    }
+
+
+def normalize_row(row):
+    """A flat feature record from either input row shape"""
+    if 'repo_data' in row:
+        ids = {field: row[field] for field in ID_FIELDS if field in row}
+        return {**features_from_github_data(row), **ids}
+    if 'language_count' not in row and 'languages' in row:
+        row = dict(row, language_count=len(row['languages'] or ()))
+    return row
+
+
+def missing_value(name):
+    """What an absent or null feature counts as"""
+    if name == 'updated_at':
+        return NO_UPDATE
+    return -1 if name == 'date_range_days' else 0
+
+
+def rows_to_columns(rows):
+    """Feature arrays for a list of flat feature records"""
+    count = len(rows)
+    columns = {}
+    for name, dtype in FEATURES:
+        if name == 'updated_at':
+            values = (update_seconds(row.get(name)) for row in rows)
+        elif name == 'date_range_days':
+            values = (-1 if row.get(name) is None else row[name] for row in rows)
+        else:
+            values = (row.get(name) or 0 for row in rows)
+        columns[name] = np.fromiter(values, dtype=dtype, count=count)
+    return columns
+
+
+def chunk_from_rows(rows):
+    """(id columns, feature arrays) for a list of flat feature records"""
+    ids = {field: [row.get(field) for row in rows] for field in ID_FIELDS if any(field in row for row in rows)}
+    return ids, rows_to_columns(rows)
+
+
+def tiers(values, thresholds, points, above=True):
+    """Points of the first threshold `values` passes (> when `above`, else <), 0 if none
+
+    Thresholds run from the strictest, like the if/elif chains in analyze_repository.
+    """
+    conditions = [values > threshold if above else values < threshold for threshold in thresholds]
+    return np.select(conditions, points, 0)
+
+
+def score_columns(columns, now=None):
+    """Breakdown components and total for feature arrays, exactly as analyze_repository scores them
+
+    `now` (a naive UTC datetime, default the current time) is what recency is
+    measured against.
+    """
+    c = columns
+    now = datetime.utcnow() if now is None else now
+    now_microseconds = (now - EPOCH) // timedelta(microseconds=1)
+
+    readme_points = 10 + tiers(c['readme_size'], (1500, 500), (10, 5))
+    documentation = np.where(c['has_readme'], readme_points, 0) + 3 * c['has_license'] + 2 * c['has_contributing']
+
+    # Counts are integers, so >= 5 is > 4 and so on
+    structure = (tiers(c['file_count'], (4, 2), (5, 3))
+                 + np.minimum(c['structure_matches'] * 2, 10))
+
+    quality = (5 * (c['language_count'] > 0) + 3 * (c['language_count'] > 2)
+               + 7 * c['has_tests'] + 5 * c['has_config'])
+
+    commit_count = c['commit_count']
+    date_points = tiers(c['date_range_days'], (30, 7, 1), (5, 3, 2))
+    commits = (tiers(commit_count, (9, 4, 2, 0), (10, 7, 5, 3))
+               + np.where(commit_count > 1, date_points, 0)
+               + tiers(c['good_messages'], (10, 5), (5, 3)))
+
+    version_control = (tiers(c['branch_count'], (3, 1), (7, 5))
+                       + 5 * c['has_gitignore'] + np.where(c['has_issues'], 3, -2))
+
+    updated = c['updated_at']
+    dated = updated != NO_UPDATE
+    days = (now_microseconds - np.where(dated, updated, 0) * 1000000) // DAY_MICROSECONDS
+    recency = tiers(days, (7, 30, 90, 180, 365), (5, 4, 3, 2, 1), above=False)
+    activity = (np.where(dated, recency, 0)
+                + tiers(c['stars'], (10, 5, 0), (3, 2, 1))
+                + tiers(c['forks'], (5, 0), (2, 1)))
+
+    scores = {
+        'documentation': np.minimum(documentation, 20),
+        'structure': np.minimum(structure, 15),
+        'quality': np.minimum(quality, 20),
+        'commits': np.minimum(commits, 20),
+        'version_control': np.clip(version_control, 0, 15),
+        'activity': np.minimum(activity, 10),
+    }
+    scores['total_score'] = sum(scores.values())
+    return scores
+
+
+def read_jsonl(path, chunk_rows=BULK_CHUNK_ROWS):
+    """Yield (id columns, feature arrays) for up to `chunk_rows` rows at a time of a JSONL file ('-' for stdin)"""
+    source = sys.stdin if path == '-' else open(path)
+    try:
+        rows = []
+        for line in source:
+            if line.strip():
+                rows.append(normalize_row(json.loads(line)))
+                if len(rows) >= chunk_rows:
+                    yield chunk_from_rows(rows)
+                    rows = []
+        if rows:
+            yield chunk_from_rows(rows)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def import_parquet():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('Parquet input and output need pyarrow (pip install pyarrow)')
+    return pyarrow, pyarrow.parquet
+
+
+def read_parquet(path, chunk_rows=BULK_CHUNK_ROWS):
+    """Yield (id columns, feature arrays) for up to `chunk_rows` rows at a time of a Parquet file
+
+    Flat feature columns are converted to arrays directly; files of fetch
+    results are reduced to features row by row.
+    """
+    _, parquet = import_parquet()
+    source = parquet.ParquetFile(path)
+    columnar = 'repo_data' not in source.schema_arrow.names
+    for batch in source.iter_batches(batch_size=chunk_rows):
+        if columnar:
+            yield batch_to_chunk(batch)
+        else:
+            yield chunk_from_rows([normalize_row(row) for row in batch.to_pylist()])
+
+
+def batch_to_chunk(batch):
+    """(id columns, feature arrays) for an Arrow record batch of flat feature columns"""
+    pyarrow, _ = import_parquet()
+    names = batch.schema.names
+    ids = {field: batch.column(field).to_pylist() for field in ID_FIELDS if field in names}
+    columns = {}
+    for name, dtype in FEATURES:
+        if name == 'language_count' and name not in names and 'languages' in names:
+            column = pyarrow.compute.list_value_length(batch.column('languages'))
+        elif name in names:
+            column = batch.column(name)
+        else:
+            columns[name] = np.full(batch.num_rows, missing_value(name), dtype=dtype)
+            continue
+        if name == 'updated_at':
+            if pyarrow.types.is_timestamp(column.type):
+                seconds = pyarrow.compute.cast(column, pyarrow.timestamp('s', tz=column.type.tz), safe=False)
+                seconds = seconds.cast(pyarrow.int64())
+                columns[name] = pyarrow.compute.fill_null(seconds, NO_UPDATE).to_numpy()
+            else:
+                columns[name] = np.fromiter(map(update_seconds, column.to_pylist()), dtype=dtype,
+                                            count=batch.num_rows)
+            continue
+        column = pyarrow.compute.fill_null(column.cast(pyarrow.int64()), missing_value(name))
+        columns[name] = column.to_numpy(zero_copy_only=False).astype(dtype)
+    return ids, columns
+
+
+def score_chunks(chunks, now=None):
+    """Yield (id columns, score arrays) for each (id columns, feature arrays) chunk"""
+    now = datetime.utcnow() if now is None else now
+    for ids, columns in chunks:
+        yield ids, score_columns(columns, now)
+
+
+def write_jsonl(scored, out):
+    count = 0
+    for ids, scores in scored:
+        columns = list(ids.items()) + [(field, scores[field].tolist()) for field in SCORE_FIELDS]
+        names = [name for name, _ in columns]
+        for values in zip(*(values for _, values in columns)):
+            out.write(json.dumps(dict(zip(names, values))) + '\n')
+            count += 1
+    return count
+
+
+def write_parquet(scored, path):
+    pyarrow, parquet = import_parquet()
+    writer = None
+    count = 0
+    try:
+        for ids, scores in scored:
+            table = pyarrow.table({**ids, **{field: scores[field] for field in SCORE_FIELDS}})
+            if writer is None:
+                writer = parquet.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            count += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def score_file(input_path, output_path='-', now=None, chunk_rows=BULK_CHUNK_ROWS):
+    """Score a JSONL or Parquet dump into JSONL or Parquet (by extension; '-' is stdin/stdout JSONL)
+
+    Returns the number of repositories scored.
+    """
+    reader = read_parquet if input_path.endswith('.parquet') else read_jsonl
+    scored = score_chunks(reader(input_path, chunk_rows), now)
+    if output_path.endswith('.parquet'):
+        return write_parquet(scored, output_path)
+    if output_path == '-':
+        return write_jsonl(scored, sys.stdout)
+    with open(output_path, 'w') as out:
+        return write_jsonl(scored, out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score exported repository metadata in bulk.')
+    parser.add_argument('input', help='JSONL or .parquet dump of feature records or fetch results (- for stdin)')
+    parser.add_argument('-o', '--output', default='-', help='.jsonl or .parquet file to write (default stdout)')
+    parser.add_argument('--now', help=f'measure recency against this UTC time ({DATE_FORMAT}) instead of now')
+    parser.add_argument('--chunk-rows', type=int, default=BULK_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    now = datetime.strptime(args.now, DATE_FORMAT) if args.now else None
+    try:
+        count = score_file(args.input, args.output, now, args.chunk_rows)
+    except RuntimeError as e:
+        parser.error(str(e))
+    print(f'Scored {count} repositories', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,484 @@
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import github_graphql
+import metrics
+import tree_index
+from aggregates import BranchCount, CommitStats
+from http_cache import CacheEntry, ResponseCache
+from rate_limiter import RateLimitError, TokenPool
+from snapshots import INCREMENTAL_ANALYSIS, CommitChain, RepoSnapshot, SnapshotStore, listing_from_tree
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+GITHUB_GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', '')
+GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', '')
+# Extra tokens to rotate through, comma separated
+GITHUB_TOKENS = [token.strip() for token in os.environ.get('GITHUB_TOKENS', '').split(',') if token.strip()]
+
+# How long an API call may queue for quota before failing with RateLimitError
+RATE_LIMIT_MAX_WAIT = float(os.environ.get('GITHUB_RATE_LIMIT_MAX_WAIT', '30'))
+# Attempts per call when GitHub answers with a rate-limit response
+MAX_ATTEMPTS = 4
+
+# Largest page GitHub serves for list endpoints, and how many recent commits the scorer reads
+PAGE_SIZE = 100
+COMMIT_LIMIT = int(os.environ.get('GITHUB_COMMIT_LIMIT', '100'))
+
+# 'rest' (five REST calls) or 'graphql' (one query for exactly the fields we score)
+FETCH_MODE = os.environ.get('GITHUB_FETCH_MODE', 'rest').lower()
+
+# (connect, read) timeout in seconds applied to every GitHub call
+REQUEST_TIMEOUT = (
+    float(os.environ.get('GITHUB_CONNECT_TIMEOUT', '5')),
+    float(os.environ.get('GITHUB_READ_TIMEOUT', '15')),
+)
+
+# Number of keep-alive connections to api.github.com and of fetch threads
+POOL_SIZE = int(os.environ.get('GITHUB_POOL_SIZE', '32'))
+
+_session = None
+_executor = None
+
+response_cache = ResponseCache()
+token_pool = TokenPool([GITHUB_TOKEN] + GITHUB_TOKENS, max_wait=RATE_LIMIT_MAX_WAIT)
+snapshot_store = SnapshotStore()
+
+
+def get_session():
+    """Return the shared keep-alive session used for all GitHub calls"""
+    global _session
+    if _session is None:
+        # requests is imported on first use, so importing this module stays cheap for cold starts
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Accept'] = 'application/vnd.github+json'
+        _session = session
+    return _session
+
+
+def get_executor():
+    """Return the shared thread pool used to fan out dependent GitHub calls"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='github')
+    return _executor
+
+
+def submit(fn, *args):
+    """Run `fn` on the shared executor in the caller's context, so per-request traces follow it"""
+    return get_executor().submit(contextvars.copy_context().run, fn, *args)
+
+
+def parse_repo_url(repo_url):
+    """Extract (owner, repo) from a GitHub URL, or None if it doesn't look like one"""
+    pattern = r'github\.com/([^/]+)/([^/]+)'
+    match = re.search(pattern, repo_url)
+
+    if not match:
+        return None
+
+    owner, repo = match.groups()
+    repo = repo.replace('.git', '')
+    return owner, repo
+
+
+def credential_scope():
+    """The credentials responses are fetched with; any pool token may serve a call"""
+    return ','.join(state.token for state in token_pool.states)
+
+
+def github_request(method, url, headers=None, **kwargs):
+    """Issue one request against the GitHub API through the token pool
+
+    The call is made with whichever token has the most quota left. Rate-limit
+    responses (primary or secondary) are retried on another token, or after
+    the advertised wait; RateLimitError is raised if no quota frees up within
+    GITHUB_RATE_LIMIT_MAX_WAIT.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        state = token_pool.acquire()
+        request_headers = dict(headers or {})
+        if state.token:
+            request_headers['Authorization'] = f'token {state.token}'
+        with metrics.github_call(url):
+            response = get_session().request(method, url, headers=request_headers, timeout=REQUEST_TIMEOUT, **kwargs)
+        metrics.record_github_bytes(url, response)
+        backoff = token_pool.record(state, response)
+        if backoff is None:
+            return response
+        print(f"GitHub rate limit on token {state.label}, backing off {backoff:.0f}s")
+    raise RateLimitError(backoff)
+
+
+def github_get(url, headers=None):
+    return github_request('GET', url, headers)
+
+
+def wait_for_quota(reserve):
+    """Block until the known quota across all tokens covers `reserve` calls"""
+    token_pool.wait_for_capacity(reserve)
+
+
+def parse_links(link_header):
+    """Map rel -> URL for a Link header"""
+    if not link_header:
+        return {}
+    from requests.utils import parse_header_links
+
+    return {link['rel']: link['url'] for link in parse_header_links(link_header) if 'rel' in link}
+
+
+def get_page(url, default, headers=None):
+    """GET a GitHub API URL and return (JSON body, Link rels), or (`default`, {}) on a non-200
+
+    Responses carrying an ETag or Last-Modified are cached and revalidated
+    with a conditional request next time; a 304 costs no rate-limit quota and
+    returns the cached (already parsed) body. Cached bodies are shared, so
+    callers must not mutate them.
+    """
+    key, entry, page, request_headers = cache_lookup(url, headers)
+    if page is not None:
+        return page
+    return cache_response(key, entry, github_get(url, request_headers), default)
+
+
+def cache_lookup(url, headers=None):
+    """Check the response cache before a GET of `url`
+
+    Returns (key, entry, page, request headers): `page` is the cached (body,
+    Link rels) when the entry is still fresh and no request is needed;
+    otherwise the request headers carry the entry's validators, if any.
+    """
+    headers = headers or {}
+    key = ResponseCache.make_key(url, credential_scope())
+    entry = response_cache.get(key)
+
+    if entry is not None and response_cache.is_fresh(entry):
+        response_cache.record('hit')
+        return key, entry, (entry.body, parse_links(entry.link)), headers
+
+    request_headers = dict(headers, **entry.validators()) if entry is not None else headers
+    return key, entry, None, request_headers
+
+
+def cache_response(key, entry, response, default):
+    """(body, Link rels) for the response to a cache_lookup request, caching it if it carries validators"""
+    if response.status_code == 304 and entry is not None:
+        response_cache.refresh(key, entry, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        response_cache.record('not_modified')
+        return entry.body, parse_links(entry.link)
+
+    response_cache.record('miss')
+    if response.status_code != 200:
+        return default, {}
+
+    body = response.json()
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    link = response.headers.get('Link')
+    if etag or last_modified:
+        response_cache.put(key, CacheEntry(etag, last_modified, body, len(response.content), link=link))
+    return body, parse_links(link)
+
+
+def get_json(url, default, headers=None):
+    """GET a GitHub API URL and return its JSON body, or `default` on a non-200"""
+    return get_page(url, default, headers)[0]
+
+
+def with_params(url, **params):
+    query = '&'.join(f'{name}={value}' for name, value in params.items())
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+class PageCursor:
+    """Which page of a list endpoint to request next, and which items of a fetched page to yield
+
+    The listing ends after `max_items` items, or after the first item
+    `until` is true for; no further pages are requested then.
+    """
+    __slots__ = ('next_url', 'remaining', 'until')
+
+    def __init__(self, url, max_items=None, per_page=PAGE_SIZE, until=None):
+        self.next_url = with_params(url, per_page=per_page)
+        self.remaining = max_items
+        self.until = until
+
+    def take(self, page, links):
+        self.next_url = links.get('next')
+        if self.until is not None:
+            for position, item in enumerate(page):
+                if self.until(item):
+                    page = page[:position + 1]
+                    self.next_url = None
+                    break
+        if self.remaining is not None:
+            page = page[:self.remaining]
+            self.remaining -= len(page)
+            if self.remaining <= 0:
+                self.next_url = None
+        return page
+
+
+def paginate(url, max_items=None, per_page=PAGE_SIZE, headers=None, until=None):
+    """Yield the items of a list endpoint page by page, following Link rel="next"
+
+    Only one page is held at a time, and no further pages are requested once
+    the PageCursor says the listing is over.
+    """
+    cursor = PageCursor(url, max_items, per_page, until)
+    while cursor.next_url:
+        yield from cursor.take(*get_page(cursor.next_url, [], headers))
+
+
+def count_items(url, headers=None):
+    """Count a list endpoint's items with a single request
+
+    With per_page=1 the page number of the rel="last" link equals the item
+    count, so nothing needs to be listed.
+    """
+    page, links = get_page(with_params(url, per_page=1), [], headers)
+    return last_page_number(links, len(page))
+
+
+def last_page_number(links, default):
+    """Page number of the rel="last" link, or `default` when there is none"""
+    match = re.search(r'[?&]page=(\d+)', links.get('last', ''))
+    return int(match.group(1)) if match else default
+
+
+def fetch_commit_stats(url, headers=None, listed=()):
+    """Stream the newest COMMIT_LIMIT commits into a CommitStats: the `listed` ones, then more from `url`"""
+    stats = CommitStats.from_commits(listed)
+    if stats.count < COMMIT_LIMIT:
+        for commit in paginate(url, max_items=COMMIT_LIMIT - stats.count, headers=headers):
+            stats.add(commit)
+    return stats
+
+
+def fetch_head_sha(owner, repo):
+    """Return the SHA at the tip of the default branch, or None if it can't be read
+
+    Uses the `sha` media type so GitHub answers with the bare 40-byte SHA
+    instead of a full commit object.
+    """
+    import requests
+
+    headers = {'Accept': 'application/vnd.github.sha'}
+    try:
+        response = github_get(f'{GITHUB_API_URL}/repos/{owner}/{repo}/commits/HEAD', headers)
+    except requests.RequestException as e:
+        print(f"Error fetching HEAD SHA: {e}")
+        return None
+    return response.text.strip() if response.status_code == 200 else None
+
+
+def graphql_url():
+    return GITHUB_GRAPHQL_URL or f'{GITHUB_API_URL}/graphql'
+
+
+def fetch_tree_signals(owner, repo, ref='HEAD'):
+    """Signals over the whole recursive tree at `ref`, or None if it can't be read
+
+    The response is streamed into a bounded tree_index.PathIndex rather than
+    parsed in one piece, and bypasses the response cache because of its size.
+    """
+    url = f'{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{ref}?recursive=1'
+    try:
+        response = github_request('GET', url, stream=True)
+        with response:
+            if response.status_code != 200:
+                return None
+            index = tree_index.build_index(response.iter_content(64 * 1024))
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Error fetching git tree: {e}")
+        return None
+    return tree_index.tree_signals(index)
+
+
+def fetch_github_data(repo_url, deep=False, head_sha=None):
+    """Extract owner and repo name from GitHub URL and fetch repository data
+
+    With `deep`, the whole git tree is indexed as well and its signals are
+    returned under 'tree_signals'. `head_sha` is the default branch HEAD if
+    the caller already looked it up; incremental fetches pin their listing
+    to it, so the result matches the HEAD it is cached under.
+    """
+    parsed = parse_repo_url(repo_url)
+    if not parsed:
+        return None
+
+    owner, repo = parsed
+    tree_signals = submit(fetch_tree_signals, owner, repo) if deep else None
+    if FETCH_MODE == 'graphql' and token_pool.authenticated:
+        github_data = fetch_github_data_graphql(owner, repo)
+    else:
+        github_data = fetch_github_data_rest(owner, repo, head_sha)
+    if github_data is not None and tree_signals is not None:
+        github_data['tree_signals'] = tree_signals.result()
+    return github_data
+
+
+def fetch_github_data_graphql(owner, repo):
+    """Fetch everything analyze_repository needs with a single GraphQL query"""
+    try:
+        response = github_request('POST', graphql_url(), json=github_graphql.build_request(owner, repo, COMMIT_LIMIT))
+        if response.status_code != 200:
+            return None
+        return github_graphql.parse_response(response.json())
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Error fetching GitHub data: {e}")
+        return None
+
+
+def fetch_github_data_rest(owner, repo, head_sha=None):
+    """Fetch repository data with one REST call per endpoint
+
+    When a snapshot of an earlier fetch exists, only what changed since is
+    fetched (see snapshots); the fresh data is snapshotted for next time.
+    """
+    headers = {}
+    base_url = f'{GITHUB_API_URL}/repos/{owner}/{repo}'
+
+    try:
+        # Fetch main repo data first: if it fails there is nothing else to ask for
+        repo_data = get_json(base_url, None, headers)
+        if repo_data is None:
+            return None
+
+        snapshot = snapshot_store.get(owner, repo) if INCREMENTAL_ANALYSIS else None
+        if snapshot:
+            github_data = fetch_changes(base_url, repo_data, snapshot, head_sha, headers)
+        else:
+            # The remaining calls are independent, so issue them concurrently
+            commit_stats = submit(fetch_commit_stats, f'{base_url}/commits', headers)
+            languages = submit(get_json, f'{base_url}/languages', {}, headers)
+            contents = submit(get_json, f'{base_url}/contents', [], headers)
+            branch_count = submit(count_items, f'{base_url}/branches', headers)
+
+            github_data = github_data_of(repo_data, commit_stats.result(), languages.result(), contents.result(),
+                                         branch_count.result())
+        remember_snapshot(owner, repo, github_data)
+        return github_data
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Error fetching GitHub data: {e}")
+        return None
+
+
+def list_new_commits(base_url, snapshot, head_sha=None, headers=None):
+    """CommitChain of the commits landed on top of the snapshot HEAD
+
+    Lists the HEAD commit first (pinned to `head_sha` when the caller knows
+    it), and the commits since the snapshot HEAD's date only when HEAD is a
+    single-parent commit whose parent isn't the snapshot HEAD.
+    """
+    chain = CommitChain(snapshot, head_sha, COMMIT_LIMIT)
+    if not chain.stopped:
+        chain.extend(get_json(head_commit_url(base_url, head_sha), [], headers))
+    if chain.wants_more():
+        chain.extend(paginate(new_commits_url(base_url, chain), COMMIT_LIMIT - len(chain.commits), headers=headers,
+                              until=chain.ends_at))
+    return chain
+
+
+def head_commit_url(base_url, head_sha=None):
+    return with_params(f'{base_url}/commits', per_page=1, **({'sha': head_sha} if head_sha else {}))
+
+
+def new_commits_url(base_url, chain):
+    """Commits from where `chain` got to, committed no earlier than the snapshot HEAD"""
+    return with_params(f'{base_url}/commits', sha=chain.next_sha, since=chain.snapshot.head_committed_at)
+
+
+def history_url(base_url, chain):
+    """Where the current history goes on after the commits `chain` holds"""
+    if chain.commits:
+        return with_params(f'{base_url}/commits', sha=chain.next_sha)
+    return f'{base_url}/commits'
+
+
+def fetch_changes(base_url, repo_data, snapshot, head_sha=None, headers=None):
+    """Bring `snapshot` up to the current HEAD, listing only the commits landed on top of it
+
+    When history didn't fast-forward from the snapshot HEAD, the rest is
+    fetched in full, keeping the branch count and the commits already listed.
+    """
+    branch_count = submit(count_items, f'{base_url}/branches', headers)
+    chain = list_new_commits(base_url, snapshot, head_sha, headers)
+    github_data = None
+    if chain.complete:
+        tree = languages = None
+        if chain.commits:
+            # The root listing comes from the new HEAD's git tree, which is much smaller than /contents
+            tree = submit(get_json, head_tree_url(base_url, chain.commits), None, headers)
+            languages = submit(get_json, f'{base_url}/languages', {}, headers)
+            tree, languages = tree.result(), languages.result()
+        github_data = apply_changes(repo_data, snapshot, chain.commits, tree, languages, branch_count.result())
+    if github_data is None:
+        commit_stats = submit(fetch_commit_stats, history_url(base_url, chain), headers, chain.commits)
+        languages = submit(get_json, f'{base_url}/languages', {}, headers)
+        contents = submit(get_json, f'{base_url}/contents', [], headers)
+        github_data = github_data_of(repo_data, commit_stats.result(), languages.result(), contents.result(),
+                                     branch_count.result())
+    return github_data
+
+
+def head_tree_url(base_url, new_commits):
+    """Git tree of the newest of `new_commits`"""
+    return f"{base_url}/git/trees/{new_commits[0]['commit']['tree']['sha']}"
+
+
+def apply_changes(repo_data, snapshot, new_commits, tree, languages, branch_count):
+    """github_data for `snapshot` moved forward by `new_commits`; None if the tree can't be used
+
+    `tree` and `languages` are the new HEAD's, fetched only when there are
+    new commits; a truncated tree can't stand in for the root listing.
+    """
+    if not new_commits:
+        return github_data_of(repo_data, snapshot.commit_stats(), snapshot.languages, snapshot.listing, branch_count)
+    if tree is None or tree.get('truncated'):
+        return None
+    commit_stats = snapshot.commit_stats().prepend(CommitStats.from_commits(new_commits), COMMIT_LIMIT)
+    return github_data_of(repo_data, commit_stats, languages, listing_from_tree(tree), branch_count)
+
+
+def github_data_of(repo_data, commit_stats, languages, contents, branch_count):
+    return {
+        'repo_data': repo_data,
+        'commit_stats': commit_stats,  # Last COMMIT_LIMIT commits
+        'languages': languages,
+        'contents': contents,
+        'branches': BranchCount(branch_count)
+    }
+
+
+def remember_snapshot(owner, repo, github_data):
+    if INCREMENTAL_ANALYSIS:
+        snapshot = RepoSnapshot.from_data(github_data)
+        if snapshot is not None:
+            snapshot_store.put(owner, repo, snapshot)
+
+
+def list_owner_repos(owner):
+    """Yield the html_url of every public repository of an organization or user"""
+    url = f'{GITHUB_API_URL}/orgs/{owner}/repos?type=public'
+    if get_json(with_params(url, per_page=1), None) is None:
+        # Not an organization; fall back to the user listing
+        url = f'{GITHUB_API_URL}/users/{owner}/repos?type=owner'
+        if get_json(with_params(url, per_page=1), None) is None:
+            raise ValueError(f'Failed to list repositories for {owner}')
+    for repo in paginate(url):
+        yield repo['html_url']
@@ -0,0 +1,101 @@
+"""Single-query GraphQL fetch backend.
+
+Asks GitHub for exactly the fields analyze_repository reads and reshapes the
+answer into the same structure the REST path returns (repo_data,
+commit_stats, languages, contents, branches), so the scorer is unaware of which backend
+produced it. Selected with GITHUB_FETCH_MODE=graphql; GitHub only serves
+GraphQL to authenticated clients, so a token is required.
+"""
+from datetime import datetime, timezone
+
+from aggregates import BranchCount, CommitStats
+
+REPOSITORY_QUERY = """
+query Repository($owner: String!, $name: String!, $commits: Int!) {
+  repository(owner: $owner, name: $name) {
+    hasIssuesEnabled
+    updatedAt
+    stargazerCount
+    forkCount
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+      edges { size node { name } }
+    }
+    refs(refPrefix: "refs/heads/", first: 0) { totalCount }
+    object(expression: "HEAD:") {
+      ... on Tree { entries { name type object { ... on Blob { byteSize } } } }
+    }
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $commits) { nodes { message author { date } } }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Most nodes GitHub returns for one connection
+MAX_PAGE_SIZE = 100
+
+# GraphQL tree entry types mapped to the REST /contents `type` values
+ENTRY_TYPES = {'blob': 'file', 'tree': 'dir', 'commit': 'submodule'}
+
+
+def to_rest_timestamp(value):
+    """GitActor dates carry the author's UTC offset; REST reports them in UTC with a Z"""
+    if not value:
+        return value
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def build_request(owner, repo, commit_limit):
+    """Query for the repository and its newest `commit_limit` commits (one page, so at most MAX_PAGE_SIZE)"""
+    variables = {'owner': owner, 'name': repo, 'commits': min(commit_limit, MAX_PAGE_SIZE)}
+    return {'query': REPOSITORY_QUERY, 'variables': variables}
+
+
+def normalize_repository(repository):
+    """Reshape the `repository` GraphQL node into fetch_github_data's structure"""
+    tree = repository.get('object') or {}
+    contents = [
+        {
+            'name': entry['name'],
+            'type': ENTRY_TYPES.get(entry['type'].lower(), entry['type'].lower()),
+            'size': (entry.get('object') or {}).get('byteSize', 0),
+        }
+        for entry in tree.get('entries') or []
+    ]
+
+    history = ((repository.get('defaultBranchRef') or {}).get('target') or {}).get('history') or {}
+    commit_stats = CommitStats.from_commits(
+        {'commit': {'author': {'date': to_rest_timestamp((node.get('author') or {}).get('date'))},
+                    'message': node['message']}}
+        for node in history.get('nodes') or []
+    )
+
+    languages = {edge['node']['name']: edge['size'] for edge in repository['languages']['edges']}
+
+    return {
+        'repo_data': {
+            'has_issues': repository['hasIssuesEnabled'],
+            'updated_at': repository['updatedAt'],
+            'stargazers_count': repository['stargazerCount'],
+            'forks_count': repository['forkCount'],
+        },
+        'commit_stats': commit_stats,
+        'languages': languages,
+        'contents': contents,
+        'branches': BranchCount(repository['refs']['totalCount']),
+    }
+
+
+def parse_response(payload):
+    """Return the normalized data for a GraphQL response body, or None if the repo wasn't found"""
+    repository = (payload.get('data') or {}).get('repository')
+    if repository is None:
+        for error in payload.get('errors') or []:
+            print(f"GitHub GraphQL error: {error.get('message')}")
+        return None
+    return normalize_repository(repository)
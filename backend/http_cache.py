@@ -0,0 +1,207 @@
+"""Conditional-request cache for GitHub API responses.
+
+Entries are keyed by URL and (a hash of) the token used to fetch them and hold
+the parsed JSON body alongside its ETag / Last-Modified validators. A
+revalidation that comes back 304 costs no GitHub quota and reuses the already
+parsed body. The in-memory tier is an LRU bounded by body bytes with a TTL; an
+optional sqlite file keeps entries across restarts.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_MAX_BYTES = int(float(os.environ.get('GITHUB_CACHE_SIZE_MB', '64')) * 1024 * 1024)
+CACHE_TTL = float(os.environ.get('GITHUB_CACHE_TTL', '3600'))
+CACHE_PATH = os.environ.get('GITHUB_CACHE_PATH', '')
+# Entries younger than this are served without revalidating (0 = always revalidate)
+CACHE_FRESH = float(os.environ.get('GITHUB_CACHE_FRESH', '0'))
+
+
+class CacheEntry:
+    __slots__ = ('etag', 'last_modified', 'body', 'size', 'stored_at', 'link')
+
+    def __init__(self, etag, last_modified, body, size, stored_at=None, link=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.size = size
+        self.stored_at = time.time() if stored_at is None else stored_at
+        # Link header of a paginated response, needed to find the next page on a 304
+        self.link = link
+
+    def validators(self):
+        """Headers that turn a GET into a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class SqliteStore:
+    """On-disk backing store so cached responses survive restarts"""
+
+    def __init__(self, path, max_bytes):
+        import sqlite3
+
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+            'body TEXT, size INTEGER, stored_at REAL, link TEXT)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(responses)')}
+        if 'link' not in columns:
+            self._conn.execute('ALTER TABLE responses ADD COLUMN link TEXT')
+        self._conn.commit()
+
+    def get(self, key):
+        row = self._conn.execute(
+            'SELECT etag, last_modified, body, size, stored_at, link FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body, size, stored_at, link = row
+        return CacheEntry(etag, last_modified, json.loads(body), size, stored_at, link)
+
+    def put(self, key, entry):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO responses (key, etag, last_modified, body, size, stored_at, link) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (key, entry.etag, entry.last_modified, json.dumps(entry.body), entry.size, entry.stored_at, entry.link),
+        )
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total > self.max_bytes:
+            # Drop the oldest rows until we are back under the bound
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY stored_at DESC) AS running'
+                ' FROM responses) WHERE running > ?)',
+                (self.max_bytes,),
+            )
+        self._conn.commit()
+
+    def touch(self, key, entry):
+        self._conn.execute(
+            'UPDATE responses SET etag = ?, last_modified = ?, stored_at = ? WHERE key = ?',
+            (entry.etag, entry.last_modified, entry.stored_at, key),
+        )
+        self._conn.commit()
+
+    def delete(self, key):
+        self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+        self._conn.commit()
+
+    def clear(self):
+        self._conn.execute('DELETE FROM responses')
+        self._conn.commit()
+
+
+class ResponseCache:
+    """LRU + TTL cache of validated GitHub responses with hit/miss/304 counters"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL, path=CACHE_PATH, fresh=CACHE_FRESH):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fresh = fresh
+        self.store = SqliteStore(path, max_bytes) if path else None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def make_key(url, credentials):
+        token_hash = hashlib.sha256(credentials.encode()).hexdigest()[:16] if credentials else '-'
+        return f'{token_hash} {url}'
+
+    def get(self, key):
+        """Return the entry for `key` if present and within TTL"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry):
+                    self._evict(key)
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+            if entry is None and self.store is not None:
+                entry = self.store.get(key)
+                if entry is not None and self._expired(entry):
+                    self.store.delete(key)
+                    entry = None
+                elif entry is not None:
+                    self._insert(key, entry)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._insert(key, entry)
+            if self.store is not None:
+                self.store.put(key, entry)
+
+    def refresh(self, key, entry, etag=None, last_modified=None):
+        """Record a successful 304 revalidation of `entry`"""
+        with self._lock:
+            entry.etag = etag or entry.etag
+            entry.last_modified = last_modified or entry.last_modified
+            entry.stored_at = time.time()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            if self.store is not None:
+                self.store.touch(key, entry)
+
+    def record(self, outcome):
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'not_modified':
+                self.not_modified += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'persistent': self.store is not None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.store is not None:
+                self.store.clear()
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.fresh
+
+    def _expired(self, entry):
+        return time.time() - entry.stored_at > self.ttl
+
+    def _insert(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,196 @@
+"""Background analysis jobs for clients that shouldn't hold a connection open.
+
+POST /api/jobs enqueues an analysis and returns a job id at once; a fixed pool
+of worker threads runs it and GET /api/jobs/<id> reports the outcome,
+optionally long-polling until the job finishes. Submitting a repository that
+already has a queued or running job returns that job instead of a new one.
+The queue holds at most JOB_QUEUE_SIZE waiting jobs; beyond that submissions
+are refused with QueueFullError. Finished jobs are forgotten after
+JOB_RESULT_TTL seconds.
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+
+from rate_limiter import RateLimitError
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '4'))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', '256'))
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', '600'))
+# Longest a status request may long-poll before answering with the current state
+JOB_MAX_WAIT = float(os.environ.get('JOB_MAX_WAIT', '30'))
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+# Seconds a client is told to wait when the queue is full
+QUEUE_FULL_RETRY_AFTER = 5
+
+
+def parse_wait(value):
+    """Long-poll seconds from a `wait` query parameter, capped at JOB_MAX_WAIT; ValueError if malformed"""
+    if not value:
+        return 0.0
+    seconds = float(value)
+    if seconds != seconds:
+        raise ValueError('wait must be a number')
+    return min(max(seconds, 0.0), JOB_MAX_WAIT)
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after=QUEUE_FULL_RETRY_AFTER):
+        super().__init__(f'Job queue is full; retry in {retry_after} seconds')
+        self.retry_after = retry_after
+
+
+class Job:
+    __slots__ = ('id', 'key', 'repo_url', 'deep', 'status', 'result', 'error', 'retry_after',
+                 'created_at', 'started_at', 'finished_at', 'future')
+
+    def __init__(self, key, repo_url, deep):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.repo_url = repo_url
+        self.deep = deep
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.retry_after = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Resolved when the job finishes; lets sync and async pollers wait on it
+        self.future = Future()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self):
+        body = {
+            'job_id': self.id,
+            'status': self.status,
+            'repo_url': self.repo_url,
+            'deep': self.deep,
+            'created_at': self.created_at,
+        }
+        if self.started_at is not None:
+            body['started_at'] = self.started_at
+        if self.finished_at is not None:
+            body['finished_at'] = self.finished_at
+        if self.status == DONE:
+            body['result'] = self.result
+        elif self.status == FAILED:
+            body['error'] = self.error
+            if self.retry_after is not None:
+                body['retry_after'] = self.retry_after
+        return body
+
+
+class JobQueue:
+    """Bounded FIFO of analysis jobs served by a fixed pool of worker threads"""
+
+    def __init__(self, run, key_fn, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, ttl=JOB_RESULT_TTL,
+                 failure_message='Analysis failed'):
+        self.run = run
+        self.key_fn = key_fn
+        self.workers = workers
+        self.ttl = ttl
+        self.failure_message = failure_message
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._pending = {}
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def submit(self, repo_url, deep=False):
+        """Return (job, created); an identical queued or running job is returned as is"""
+        key = self.key_fn(repo_url, deep)
+        with self._lock:
+            self._expire()
+            job = self._pending.get(key)
+            if job is not None:
+                self.deduplicated += 1
+                return job, False
+            job = Job(key, repo_url, deep)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError()
+            self._jobs[job.id] = job
+            self._pending[key] = job
+            self.submitted += 1
+            self._start_workers()
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Return the job once it finishes or `timeout` seconds pass, or None if unknown"""
+        job = self.get(job_id)
+        if job is not None and not job.finished and timeout > 0:
+            wait([job.future], timeout=timeout)
+        return job
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            running = sum(1 for job in self._pending.values() if job.status == RUNNING)
+            return {
+                'queued': len(self._pending) - running,
+                'running': running,
+                'finished': len(self._finished),
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected,
+                'workers': self.workers,
+            }
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'job-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            result = error = retry_after = None
+            try:
+                result = self.run(job.repo_url, job.deep)
+                if not result:
+                    error = self.failure_message
+            except RateLimitError as e:
+                error, retry_after = str(e), e.retry_after
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+            with self._lock:
+                job.result, job.error, job.retry_after = result, error, retry_after
+                job.status = FAILED if error else DONE
+                job.finished_at = time.time()
+                del self._pending[job.key]
+                self._finished[job.id] = job
+            job.future.set_result(job)
+            self._queue.task_done()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self._finished:
+            job_id, job = next(iter(self._finished.items()))
+            if job.finished_at > cutoff:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
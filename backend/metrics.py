@@ -0,0 +1,251 @@
+"""Latency histograms and counters exported in the Prometheus text format.
+
+Timers wrap each API request, each analysis pipeline stage and each outbound
+GitHub call. A request sent with the TRACE_HEADER header also collects its own
+stage breakdown, which comes back in a Server-Timing response header. With
+METRICS_ENABLED off and no trace requested, stage() and github_call() return a
+shared no-op timer, so instrumented code costs one context variable lookup.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+TRACE_HEADER = 'X-Analysis-Trace'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_trace = contextvars.ContextVar('trace', default=None)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            lines.append(f'{self.name}{format_labels(self.labels, label_values)} {format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; each series is [per-bucket counts..., +Inf count, sum]"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((label_values, list(values)) for label_values, values in self.series.items())
+        for label_values, values in series:
+            names = self.labels + ('le',)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(names, label_values + (bound,))} {cumulative}')
+            labels = format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {values[-1]!r}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+HTTP_SECONDS = Histogram('http_request_duration_seconds', 'API request latency by endpoint', ('endpoint',))
+HTTP_RESPONSES = Counter('http_responses_total', 'API responses by endpoint and status', ('endpoint', 'status'))
+HTTP_BYTES = Counter('http_response_bytes_total', 'API response body bytes by endpoint', ('endpoint',))
+STAGE_SECONDS = Histogram('analysis_stage_duration_seconds', 'Analysis pipeline stage latency', ('stage',))
+GITHUB_SECONDS = Histogram('github_request_duration_seconds', 'Outbound GitHub API call latency', ('endpoint',))
+GITHUB_BYTES = Counter('github_response_bytes_total', 'GitHub API response body bytes', ('endpoint',))
+
+REGISTRY = [HTTP_SECONDS, HTTP_RESPONSES, HTTP_BYTES, STAGE_SECONDS, GITHUB_SECONDS, GITHUB_BYTES]
+COLLECTORS = []
+
+
+def add_collector(collect):
+    """Register a callable returning (name, type, help, [(labels dict, value)]) tuples, read at scrape time"""
+    COLLECTORS.append(collect)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in COLLECTORS:
+        for name, kind, help, samples in collect():
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+            for labels, value in samples:
+                lines.append(f'{name}{format_labels(tuple(labels), tuple(labels.values()))} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class Trace:
+    """Stage durations of one request, in first-seen order"""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, calls = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, calls + 1)
+
+    def server_timing(self):
+        """Render as a Server-Timing header value (durations in milliseconds)"""
+        with self._lock:
+            stages = list(self.stages.items())
+        return ', '.join(
+            f'{name};dur={total * 1000:.1f}' + (f';desc="{calls} calls"' if calls > 1 else '')
+            for name, (total, calls) in stages
+        )
+
+
+def start_trace():
+    """Collect stages for the current request; returns a token for end_trace"""
+    return _trace.set(Trace())
+
+
+def current_trace():
+    return _trace.get()
+
+
+def end_trace(token):
+    trace = _trace.get()
+    _trace.reset(token)
+    return trace
+
+
+def trace_requested(value):
+    return bool(value) and value.lower() not in ('0', 'false', 'no')
+
+
+class Timer:
+    __slots__ = ('histogram', 'label', 'trace', 'trace_name', 'start')
+
+    def __init__(self, histogram, label, trace, trace_name):
+        self.histogram = histogram
+        self.label = label
+        self.trace = trace
+        self.trace_name = trace_name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if METRICS_ENABLED:
+            self.histogram.observe((self.label,), elapsed)
+        if self.trace is not None:
+            self.trace.add(self.trace_name, elapsed)
+
+
+class NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def stage(name):
+    """Time an analysis pipeline stage"""
+    trace = _trace.get()
+    if trace is None and not METRICS_ENABLED:
+        return NULL_TIMER
+    return Timer(STAGE_SECONDS, name, trace, name)
+
+
+def github_call(url):
+    """Time one outbound GitHub API call"""
+    trace = _trace.get()
+    if trace is None and not METRICS_ENABLED:
+        return NULL_TIMER
+    endpoint = github_endpoint(url)
+    return Timer(GITHUB_SECONDS, endpoint, trace, f'github.{endpoint}')
+
+
+def record_github_bytes(url, response):
+    """Count a GitHub response body by its Content-Length (never reads a streamed body)"""
+    length = response.headers.get('Content-Length')
+    if METRICS_ENABLED and length:
+        GITHUB_BYTES.inc((github_endpoint(url),), int(length))
+
+
+def record_response(endpoint, status, seconds, size):
+    if not METRICS_ENABLED:
+        return
+    HTTP_SECONDS.observe((endpoint,), seconds)
+    HTTP_RESPONSES.inc((endpoint, str(status)))
+    if size:
+        HTTP_BYTES.inc((endpoint,), size)
+
+
+def github_endpoint(url):
+    """Low-cardinality label for a GitHub API URL, e.g. 'repo', 'commits', 'head_sha', 'graphql'"""
+    parts = urlsplit(url).path.strip('/').split('/')
+    if parts[-1] == 'graphql':
+        return 'graphql'
+    if parts[-1] == 'repos':
+        return 'owner_repos'
+    if 'repos' not in parts:
+        return 'other'
+    rest = parts[parts.index('repos') + 3:]
+    if not rest:
+        return 'repo'
+    if rest[0] == 'commits' and len(rest) > 1:
+        return 'head_sha'
+    if rest[0] == 'git':
+        return 'tree'
+    return rest[0]
+
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
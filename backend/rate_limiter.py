@@ -0,0 +1,144 @@
+"""Rate-limit-aware scheduling of GitHub API calls across a pool of tokens.
+
+Every response's X-RateLimit-Remaining / X-RateLimit-Reset headers are
+recorded against the token that made the call. New calls go to the token with
+the most quota left; when every token is exhausted (or backing off after a
+secondary rate limit) callers queue until one becomes usable instead of
+failing. Only if that would take longer than the allowed wait is a
+RateLimitError raised, so callers can tell "rate limited" from "not found".
+"""
+import threading
+import time
+
+# GitHub asks clients to wait at least a minute after a secondary limit without Retry-After
+SECONDARY_LIMIT_BACKOFF = 60
+
+
+class RateLimitError(Exception):
+    """GitHub quota is exhausted for longer than the caller is willing to wait"""
+
+    def __init__(self, retry_after):
+        self.retry_after = max(int(retry_after + 0.999), 1)
+        super().__init__(f'GitHub API rate limit exceeded; retry in {self.retry_after}s')
+
+
+class TokenState:
+    __slots__ = ('token', 'label', 'remaining', 'limit', 'reset', 'blocked_until', 'requests')
+
+    def __init__(self, token):
+        self.token = token
+        self.label = f'…{token[-4:]}' if token else 'anonymous'
+        self.remaining = None
+        self.limit = None
+        self.reset = None
+        self.blocked_until = 0.0
+        self.requests = 0
+
+    def available_at(self, now):
+        """Earliest time this token may be used again"""
+        if self.blocked_until > now:
+            return self.blocked_until
+        if self.remaining is not None and self.remaining <= 0 and self.reset and self.reset > now:
+            return self.reset
+        return now
+
+
+class TokenPool:
+    """Hands out the token with the most remaining quota, queueing when all are exhausted"""
+
+    def __init__(self, tokens, max_wait=30.0):
+        tokens = [token for token in dict.fromkeys(tokens) if token]
+        self.states = [TokenState(token) for token in tokens] or [TokenState('')]
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+
+    @property
+    def authenticated(self):
+        return bool(self.states[0].token)
+
+    def acquire(self, max_wait=None):
+        """Reserve one call on the best token, waiting up to `max_wait` seconds for quota"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.time() + max_wait
+        with self._cond:
+            while True:
+                now = time.time()
+                ready = [state for state in self.states if state.available_at(now) <= now]
+                if ready:
+                    state = max(ready, key=lambda s: float('inf') if s.remaining is None else s.remaining)
+                    if state.remaining is not None:
+                        state.remaining -= 1
+                    state.requests += 1
+                    return state
+                wake_at = min(state.available_at(now) for state in self.states)
+                if wake_at > deadline:
+                    raise RateLimitError(wake_at - now)
+                self._cond.wait(wake_at - now)
+
+    def record(self, state, response):
+        """Update `state` from a response; return seconds to back off before retrying, or None"""
+        headers = response.headers
+        now = time.time()
+        with self._cond:
+            remaining = headers.get('X-RateLimit-Remaining')
+            if remaining is not None:
+                state.remaining = int(remaining)
+                state.limit = int(headers.get('X-RateLimit-Limit') or 0) or state.limit
+                reset = headers.get('X-RateLimit-Reset')
+                state.reset = int(reset) if reset else state.reset
+
+            if response.status_code not in (403, 429):
+                self._cond.notify_all()
+                return None
+
+            retry_after = headers.get('Retry-After')
+            if retry_after is not None:
+                # Secondary rate limit: GitHub tells us exactly how long to wait
+                state.blocked_until = now + float(retry_after)
+            elif remaining == '0':
+                # Primary limit: unusable until the window resets
+                state.blocked_until = max(float(state.reset or now + SECONDARY_LIMIT_BACKOFF), now)
+            elif 'rate limit' in response.text.lower():
+                state.blocked_until = now + SECONDARY_LIMIT_BACKOFF
+            else:
+                # A genuine 403 (e.g. forbidden resource), not a rate limit
+                self._cond.notify_all()
+                return None
+
+            self._cond.notify_all()
+            return state.blocked_until - now
+
+    def wait_for_capacity(self, reserve):
+        """Block until the known quota across all tokens covers `reserve` calls"""
+        with self._cond:
+            while True:
+                now = time.time()
+                known = [s.remaining for s in self.states if s.remaining is not None and s.available_at(now) <= now]
+                unknown = any(s.remaining is None and s.available_at(now) <= now for s in self.states)
+                if unknown or sum(known) >= reserve:
+                    return
+                soonest = min((s.reset or now + SECONDARY_LIMIT_BACKOFF) for s in self.states)
+                soonest = max(soonest, min(s.available_at(now) for s in self.states))
+                if soonest <= now:
+                    # Window rolled over without a fresh response yet; let calls through to learn the new quota
+                    for state in self.states:
+                        if state.reset and state.reset <= now:
+                            state.remaining = None
+                    continue
+                print(f"GitHub quota low ({sum(known)} left), waiting {soonest - now:.0f}s for reset")
+                self._cond.wait(min(soonest - now, 60))
+
+    def snapshot(self):
+        now = time.time()
+        with self._cond:
+            return [
+                {
+                    'token': state.label,
+                    'remaining': state.remaining,
+                    'limit': state.limit,
+                    'reset': state.reset,
+                    'requests': state.requests,
+                    'blocked_for': max(round(state.available_at(now) - now), 0),
+                }
+                for state in self.states
+            ]
@@ -0,0 +1,164 @@
+"""Serialized, compressed and tagged API response bodies.
+
+A representation (an analysis in one shape, the roadmap templates) is
+serialized once and compressed at most once per content coding, then served
+from memory for as long as its source object is the one cached, so a repeat
+view re-sends stored bytes instead of re-encoding the roadmap. Brotli is used
+when the client accepts it and the brotli package is installed, gzip otherwise.
+
+Its strong ETag hashes the representation key (the result-cache key and
+shape) with the uncompressed body, so a result recomputed under the same key
+after ANALYSIS_CACHE_TTL only keeps its tag if nothing in it changed.
+Compressed bodies get the coding appended to the tag, and If-None-Match
+matches any coding of the same body.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '1024'))
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '1').lower() not in ('0', 'false', 'no')
+# Below this many bytes the Content-Encoding header and framing cost about what compression saves
+COMPRESS_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESS_MIN_SIZE', '512'))
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+
+# Preferred first when the client weights them equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(accept_encoding):
+    """The content coding to send for an Accept-Encoding header, or None for identity"""
+    if not RESPONSE_COMPRESSION or not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    default = weights.get('*', 0.0)
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header names `etag` in any content coding (weak comparison)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip().removeprefix('W/')
+        if tag == '*' or tag == etag:
+            return True
+        for encoding in ENCODINGS:
+            if tag == f'{etag[:-1]}-{encoding}"':
+                return True
+    return False
+
+
+class EncodedBody:
+    """One representation's serialized body, its compressed forms and ETag"""
+
+    __slots__ = ('source', 'etag', 'bodies', 'size')
+
+    def __init__(self, source, body, etag):
+        self.source = source
+        self.etag = etag
+        self.bodies = {None: body}
+        self.size = len(body)
+
+    def encoded(self, encoding):
+        body = self.bodies.get(encoding)
+        if body is None:
+            # Two threads may both compress a new coding; they store the same bytes
+            body = self.bodies[encoding] = compress(self.bodies[None], encoding)
+        return body
+
+
+class ResponseEncoder:
+    """LRU of EncodedBody by representation key, answering conditional and compressed requests"""
+
+    def __init__(self, serialize, max_entries=RESPONSE_CACHE_SIZE):
+        self.serialize = serialize
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(self, key, source, render, accept_encoding='', if_none_match='', cache_control='no-cache'):
+        """Return (status, headers, body) for `source` rendered by render(source)
+
+        `key` names the representation, or is None for one that shouldn't be
+        kept or tagged. Pass `if_none_match` only for GET requests.
+        """
+        entry = self._entry(key, source, render)
+        encoding = negotiate_encoding(accept_encoding) if entry.size >= COMPRESS_MIN_SIZE else None
+        headers = [('Vary', 'Accept-Encoding'), ('Cache-Control', cache_control)]
+        if entry.etag is not None:
+            headers.append(('ETag', entry.etag if encoding is None else f'{entry.etag[:-1]}-{encoding}"'))
+            if etag_matches(if_none_match, entry.etag):
+                with self._lock:
+                    self.not_modified += 1
+                return 304, headers, b''
+        headers.append(('Content-Type', 'application/json'))
+        if encoding is not None:
+            headers.append(('Content-Encoding', encoding))
+        return 200, headers, entry.encoded(encoding)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'entries': len(self._entries),
+                'encodings': list(ENCODINGS) if RESPONSE_COMPRESSION else [],
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _entry(self, key, source, render):
+        if key is None:
+            return EncodedBody(source, self.serialize(render(source)), None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.source is source:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+            self.misses += 1
+        body = self.serialize(render(source))
+        etag = '"' + hashlib.blake2b(repr(key).encode() + body, digest_size=12).hexdigest() + '"'
+        entry = EncodedBody(source, body, etag)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
@@ -0,0 +1,138 @@
+"""Memoized analysis results with single-flight deduplication.
+
+Results are keyed by normalized owner/repo, the default branch HEAD SHA and
+the scoring version, so a repeat request for an unchanged repository only
+costs the HEAD lookup. Concurrent requests for the same key wait on the one
+computation already in flight instead of each fetching from GitHub.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+RESULT_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '1024'))
+# Bounds how stale time-dependent signals (activity, stars, forks) can get
+RESULT_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', '600'))
+
+
+def make_result_key(owner, repo, head_sha, scoring_version, variant=''):
+    return (owner.lower(), repo.lower(), head_sha, scoring_version, variant)
+
+
+class ResultCache:
+    """LRU + TTL cache of analysis results that coalesces concurrent misses"""
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing it at most once at a time
+
+        `compute` results of None are treated as failures and not cached.
+        Exceptions raised by `compute` propagate to every waiting caller.
+        """
+        value, future, owner = self._claim(key)
+        if value is not None:
+            return value
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        return self._resolve(key, future, value)
+
+    async def get_or_compute_async(self, key, compute):
+        """get_or_compute for a coroutine function, awaiting instead of blocking
+
+        Sync and async callers share the same in-flight computations.
+        """
+        value, future, owner = self._claim(key)
+        if value is not None:
+            return value
+        if not owner:
+            import asyncio
+
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        return self._resolve(key, future, value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _claim(self, key):
+        """Return (cached value, in-flight future, whether the caller must compute)"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value, None, False
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            return None, future, owner
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            del self._inflight[key]
+        future.set_exception(error)
+
+    def _resolve(self, key, future, value):
+        with self._lock:
+            if value is not None:
+                self._store(key, value)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def _lookup(self, key):
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        stored_at, value = cached
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
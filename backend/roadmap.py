@@ -0,0 +1,251 @@
+"""Summary and roadmap text for generate_summary_and_roadmap.
+
+The roadmap rules are the original if-chain in priority order; their
+messages are module constants, so a roadmap is a list of shared strings that
+map back to their ids in ROADMAP_TEMPLATES. The chain returns as soon as
+ROADMAP_LIMIT items are listed rather than building every item and slicing.
+"""
+import hashlib
+import json
+
+ROADMAP_LIMIT = 12
+
+ROADMAP_MESSAGES = {
+    'readme_missing': "⚠️ CRITICAL ISSUE: Your repository is missing a README.md file. Without it, no one knows what your project does or how to use it. Create README.md immediately and include: project title, description, installation steps (prerequisites, dependencies, setup commands), usage examples with code snippets, and screenshots/demo links. This is non-negotiable for any serious project.",
+    'readme_brief': "❌ WEAK DOCUMENTATION: Your README.md exists but is too brief (under 500 characters). Recruiters will skip your project. Fix this by adding: detailed setup instructions, usage examples, API documentation if applicable, troubleshooting section, and contribution guidelines. A good README should be 1500+ characters.",
+    'readme_shallow': "⚡ GOOD START, NEEDS MORE: Your README has basic info but lacks depth. Add these missing sections: project badges (build status, license), detailed feature list, architecture diagram or flowchart, environment variables setup, deployment instructions, and FAQ section. Make it comprehensive.",
+    'tests_missing': "🚨 NO TESTS DETECTED: This is a major red flag for employers. Your code has zero automated tests, meaning you're not validating functionality. Fix this NOW: For JavaScript/TypeScript use Jest or Mocha, for Python use pytest or unittest, for Java use JUnit. Start with testing critical functions, then add integration tests. Aim for 60%+ coverage minimum.",
+    'tests_limited': "✅ TESTS EXIST, BUT EXPAND COVERAGE: You have some tests which is good, but coverage seems limited. Add: edge case testing (null values, empty inputs, boundary conditions), integration tests for API endpoints, end-to-end tests for critical user flows, and mock external dependencies properly.",
+    'structure_poor': "❌ POOR PROJECT STRUCTURE: Your files are disorganized or dumped in root directory. This looks unprofessional. Restructure immediately: Create src/ or lib/ for source code, tests/ or __tests__/ for test files, docs/ for documentation, config/ for configuration files, and public/assets/ for static files. Follow your framework's conventions (e.g., React uses src/components/, Python uses package_name/ with __init__.py).",
+    'structure_basic': "⚠️ STRUCTURE NEEDS IMPROVEMENT: Your folder organization is basic but not optimal. Improve by: grouping related files into modules/packages, separating business logic from UI components, creating a clear separation between utility functions and main code, and adding index files for cleaner imports.",
+    'quality_tools': "🚨 CODE QUALITY TOOLS MISSING: You don't have linting or formatting setup. Code probably has inconsistent style. Fix this: Install ESLint + Prettier (JavaScript), Black + Pylint (Python), or RuboCop (Ruby). Add .eslintrc or .pylintrc config files. Set up pre-commit hooks using Husky (JS) or pre-commit (Python) to run checks automatically. This prevents messy code from being committed.",
+    'type_checking': "❌ NO TYPE CHECKING: Your project lacks type safety which leads to runtime errors. Migrate to TypeScript if using JavaScript, add type hints to Python functions (use mypy for checking), or use PropTypes/Flow for React. Type checking catches bugs before runtime.",
+    'quality_strict': "⚡ TIGHTEN CODE QUALITY: You have basic quality tools but they're not strict enough. Configure stricter linting rules (e.g., airbnb style guide for ESLint), enable error-on-warning in CI, add complexity checks (max function length, cyclomatic complexity), and enforce 100% type coverage.",
+    'commits_few': "❌ VERY FEW COMMITS: You have less than 5 commits. This either means you committed everything at once (bad practice) or barely worked on this. Show your development process by: committing after each logical change, writing descriptive commit messages using format 'type(scope): description' (e.g., 'feat(auth): add login validation'), and never commit large chunks of unrelated changes together.",
+    'commits_infrequent': "⚠️ LOW COMMIT FREQUENCY: Your commit count is below average. This suggests infrequent commits with too many changes bundled together. Best practice: commit every 30-60 minutes of work, use atomic commits (one logical change per commit), write messages that explain WHY not just WHAT (e.g., 'fix(api): handle null response to prevent crash' instead of 'fix bug'), and never use vague messages like 'Update', 'Fix', or 'Changes'.",
+    'commit_messages': "✅ GOOD COMMIT COUNT, IMPROVE MESSAGES: You commit regularly but your commit messages need work. Many are probably unclear or too generic. Follow conventional commits: 'feat:' for features, 'fix:' for bugs, 'docs:' for documentation, 'refactor:' for code improvements, 'test:' for tests, 'chore:' for maintenance. Add detailed descriptions in commit body for complex changes.",
+    'single_branch': "🚨 WORKING ONLY ON MAIN BRANCH: This is extremely poor practice. You're committing everything directly to main/master which is risky and unprofessional. Fix this immediately: Create a 'develop' branch for ongoing work using 'git checkout -b develop', for each new feature create a feature branch 'git checkout -b feature/feature-name', work on feature branch, then merge via Pull Request with code review, keep main branch protected and production-ready only.",
+    'pull_request_workflow': "❌ NO PULL REQUEST WORKFLOW: Without branches, you can't use Pull Requests. This means no code review, no CI checks before merge, and no discussion on changes. Adopt GitHub Flow: create feature branch → push → open PR → review → merge. Even solo developers should use PRs for discipline and CI automation.",
+    'branching_limited': "⚠️ LIMITED BRANCHING: You have a few branches but not using them effectively. Improve by: creating a new branch for EVERY feature/bugfix (don't reuse branches), using descriptive branch names like 'feature/user-authentication' or 'bugfix/fix-memory-leak', deleting branches after merging to keep repo clean, and using branch protection rules to prevent direct commits to main.",
+    'license_missing': "⚠️ NO LICENSE FILE: Your code has no legal protection. Anyone can steal it, and many developers won't contribute to unlicensed projects. Add LICENSE file immediately: Use MIT for permissive open-source, Apache 2.0 for patent protection, GPL for copyleft, or choose at choosealicense.com. Copy the license text, replace [year] and [fullname], and commit it.",
+    'gitignore_missing': "❌ MISSING .gitignore: You're likely committing files you shouldn't (node_modules/, __pycache__/, .env, .DS_Store, build artifacts). This bloats your repo and exposes secrets. Create .gitignore NOW: For Node.js add 'node_modules/', '.env', 'dist/', for Python add '__pycache__/', '*.pyc', 'venv/', '.env', for Java add 'target/', '*.class'. Use gitignore.io to generate comprehensive templates.",
+    'ci_pipeline': "⚡ ADD CI/CD PIPELINE: You're manually testing and deploying which is error-prone and slow. Set up GitHub Actions: Create .github/workflows/ci.yml, add jobs for 'npm test' or 'pytest', run linting, build the project, and fail PR if tests fail. This catches bugs before they reach main branch. Example: on every push, auto-run tests, lint, and type check.",
+    'pre_commit_hooks': "🔧 AUTOMATE WITH PRE-COMMIT HOOKS: You're probably committing code that fails linting or tests. Stop this: Install Husky (for JS/TS) or pre-commit (for Python), configure hooks to run linters and formatters before commit, add 'npm run lint' and 'npm test' to pre-commit, reject commit if checks fail. This enforces quality before code even reaches Git.",
+    'continuous_deployment': "🚀 SETUP CONTINUOUS DEPLOYMENT: You're manually deploying which wastes time and creates inconsistency. Automate it: Use GitHub Actions to deploy on successful merge to main, deploy to Vercel/Netlify (frontend), Heroku/Railway (backend), or AWS/Azure (production). Add staging environment for testing before production. Example workflow: push to develop → auto-deploy to staging, merge to main → auto-deploy to production.",
+    'readability': "❌ CODE READABILITY ISSUES: Your code probably has poor naming, long functions, and little comments. Refactor immediately: Use descriptive variable names (getUserById not gud), keep functions under 30 lines (extract complex logic), add JSDoc/docstrings for all public functions explaining parameters and return values, remove commented-out code, and explain 'why' not 'what' in comments. Example: '// Retry 3 times because API rate limits' not '// Loop 3 times'.",
+    'project_config': "⚠️ PROJECT CONFIGURATION MISSING: Your project lacks proper configuration files which makes it hard to run. Add: package.json with scripts and dependencies (Node.js), requirements.txt or pyproject.toml (Python), pom.xml or build.gradle (Java). Include setup instructions in README: how to install dependencies, how to run locally, how to build for production.",
+    'code_docs': "📚 ADD CODE DOCUMENTATION: Your README is decent but code itself lacks documentation. Fix by: adding docstrings to all functions and classes (Python), using JSDoc for JavaScript functions, documenting complex algorithms with inline comments, creating API.md file for backend endpoints with request/response examples, and adding architectural decision records (ADR) for major design choices.",
+    'contributing_guide': "🤝 CREATE CONTRIBUTING.md: You want contributors but no guidelines exist. This confuses people. Create CONTRIBUTING.md with: how to set up dev environment, coding style guide, how to submit PR (fork, branch, commit, PR), how to run tests, how to report bugs, and code of conduct. This increases quality contributions.",
+    'issues_disabled': "❌ ISSUES NOT ENABLED: You have no way to track bugs and features. Enable GitHub Issues immediately and: create issue templates for bugs and features (.github/ISSUE_TEMPLATE/), use labels (bug, enhancement, documentation), create milestones for version planning, reference issues in commits ('fixes #42'), and close issues via PRs automatically. This shows organized project management.",
+    'pull_requests': "⚠️ NOT USING PULL REQUESTS: You're merging code without review which lets bugs slip through. Start using PRs even when solo: create PR for every feature branch, write PR description explaining what and why, add PR template (.github/pull_request_template.md) with checklist (tests added, docs updated, no conflicts), request reviews from teammates, and require passing CI before merge. This creates accountability and documentation.",
+    'performance': "⚡ OPTIMIZE PERFORMANCE: Your code works but may have performance issues. Profile and optimize: use Chrome DevTools or Lighthouse (web), cProfile or py-spy (Python), identify bottlenecks (N+1 queries, unnecessary re-renders, unoptimized loops), add caching for expensive operations, lazy load images and components, and measure improvements with benchmarks. Don't guess, measure.",
+    'visibility': "📊 LOW VISIBILITY: Your project is good but no one knows about it (0 stars). Fix this: add shields.io badges to README (build status, license, version), write clear project description on GitHub, add 5-10 relevant topics/tags (react, api, machine-learning), create demo GIF or video, share on Reddit/Twitter/Dev.to, and optimize README as landing page to convert visitors to users/contributors.",
+    'docs_site': "📖 CREATE COMPREHENSIVE DOCS: Your project is advanced but documentation isn't complete. Build a docs site: use Docusaurus, VuePress, or MkDocs, include Getting Started guide, API reference with examples, architecture overview with diagrams, troubleshooting section, migration guides between versions, and deploy docs to GitHub Pages or Netlify. Great projects have great docs.",
+    'examples': "🎯 ADD EXAMPLES AND DEMOS: You have good code but users need to see it in action. Create: 'examples/' folder with working sample projects, live demo deployed on free hosting, video walkthrough on YouTube, blog post explaining architecture and decisions, and interactive playground if applicable (CodeSandbox, Repl.it). Show, don't just tell.",
+    'security': "🔒 SECURITY VULNERABILITIES: Your repo might expose secrets or use vulnerable dependencies. Audit immediately: never commit API keys or passwords (use .env files), add .env to .gitignore, scan dependencies with 'npm audit' or 'safety check', keep packages updated, use Dependabot for automated security updates, validate all user inputs, and run OWASP security checks. Security breaches destroy reputation.",
+    'maintain_quality': "🌟 EXCELLENT PROJECT, MAINTAIN QUALITY: Your repo is top-tier, now sustain it: set up Renovate or Dependabot for auto dependency updates, respond to issues within 48 hours, release new versions with detailed changelogs following semver, write migration guides for breaking changes, monitor error tracking (Sentry, Bugsnag), collect user feedback via discussions, and plan roadmap openly.",
+    'scale_impact': "🚀 SCALE YOUR IMPACT: You've mastered this project, time to amplify: give conference talks about your work, write technical blog posts on Medium/Dev.to, mentor junior developers via issues/discussions, contribute to related open-source projects, create video tutorials, build a community (Discord/Slack), or turn project into SaaS product. Share your expertise.",
+}
+
+# Some guidance even for perfect repos
+FALLBACK_MESSAGES = {
+    'keep_going': "Outstanding repository! Keep up the excellent work and continue following best practices",
+    'share_knowledge': "Share your knowledge: write technical blog posts, give talks, or create tutorials about your project",
+    'engage_users': "Engage with your users through issues, discussions, and regular updates",
+}
+FALLBACK_ROADMAP = tuple(FALLBACK_MESSAGES.values())
+
+# Every roadmap item by id, for clients that fetch the texts once (compact responses)
+ROADMAP_TEMPLATES = {**ROADMAP_MESSAGES, **FALLBACK_MESSAGES}
+ROADMAP_TEMPLATES_VERSION = hashlib.blake2b(json.dumps(ROADMAP_TEMPLATES, sort_keys=True).encode(),
+                                            digest_size=6).hexdigest()
+# Roadmaps hold the template strings themselves, so their hashes are cached and lookups are cheap
+ROADMAP_IDS = {text: key for key, text in ROADMAP_TEMPLATES.items()}
+
+
+def summary_and_roadmap(analysis_result):
+    """Return (summary, roadmap items) for an analyze_repository result"""
+    score = analysis_result['total_score']
+    metrics = analysis_result['metrics']
+    breakdown = analysis_result['breakdown']
+    messages = ROADMAP_MESSAGES
+
+    summary_parts = []
+
+    # Documentation assessment
+    if breakdown['documentation'] >= 15:
+        summary_parts.append("The repository has strong documentation")
+    elif breakdown['documentation'] >= 10:
+        summary_parts.append("Documentation is present but could be more comprehensive")
+    else:
+        summary_parts.append("Documentation is lacking and needs significant improvement")
+
+    # Code quality and structure
+    if breakdown['quality'] >= 15 and breakdown['structure'] >= 12:
+        summary_parts.append("code structure is clean and well-organized")
+    elif breakdown['quality'] >= 10 or breakdown['structure'] >= 8:
+        summary_parts.append("code organization is acceptable but has room for improvement")
+    else:
+        summary_parts.append("code structure and organization need significant work")
+
+    # Testing
+    if metrics['has_tests']:
+        summary_parts.append("Tests are included which is great for maintainability")
+    else:
+        summary_parts.append("tests are missing and should be added")
+
+    # Commit history
+    if breakdown['commits'] >= 15:
+        summary_parts.append("The commit history shows consistent development practices")
+    elif breakdown['commits'] >= 10:
+        summary_parts.append("Commit activity is moderate")
+    else:
+        summary_parts.append("More frequent and meaningful commits are needed")
+
+    # Version control practices
+    if breakdown['version_control'] >= 10:
+        summary_parts.append("Good use of Git best practices")
+    else:
+        summary_parts.append("Version control practices need improvement")
+
+    # Combine into natural sentences
+    summary = f"{summary_parts[0]}, {summary_parts[1]}, and {summary_parts[2]}. " + ". ".join(summary_parts[3:]) + "."
+    summary = summary.replace(".. ", ". ").replace("..", ".")
+
+    # Roadmap items in priority order, at most ROADMAP_LIMIT of them
+    roadmap = []
+
+    # Critical items first (documentation)
+    if not metrics['has_readme']:
+        roadmap.append(messages['readme_missing'])
+    elif metrics['readme_size'] < 500:
+        roadmap.append(messages['readme_brief'])
+    elif metrics['readme_size'] < 1500:
+        roadmap.append(messages['readme_shallow'])
+
+    # Testing
+    if not metrics['has_tests']:
+        roadmap.append(messages['tests_missing'])
+    elif breakdown['quality'] < 15:
+        roadmap.append(messages['tests_limited'])
+
+    # Project structure
+    if breakdown['structure'] < 8:
+        roadmap.append(messages['structure_poor'])
+    elif breakdown['structure'] < 12:
+        roadmap.append(messages['structure_basic'])
+
+    # Code quality
+    if breakdown['quality'] < 10:
+        roadmap.append(messages['quality_tools'])
+        roadmap.append(messages['type_checking'])
+    elif breakdown['quality'] < 15:
+        roadmap.append(messages['quality_strict'])
+
+    # Git best practices
+    if metrics['commit_count'] < 5:
+        roadmap.append(messages['commits_few'])
+    elif metrics['commit_count'] < 15:
+        roadmap.append(messages['commits_infrequent'])
+    elif breakdown['commits'] < 15:
+        roadmap.append(messages['commit_messages'])
+
+    # Branching strategy
+    if metrics['branch_count'] <= 1:
+        roadmap.append(messages['single_branch'])
+        roadmap.append(messages['pull_request_workflow'])
+    elif metrics['branch_count'] <= 3:
+        roadmap.append(messages['branching_limited'])
+
+    # Essential files
+    if not metrics['has_license']:
+        roadmap.append(messages['license_missing'])
+
+    if not metrics['has_gitignore']:
+        roadmap.append(messages['gitignore_missing'])
+
+    # At most 10 items so far; from here on each rule can fill the roadmap
+
+    # CI/CD and automation
+    if score >= 50 and breakdown['quality'] >= 10:
+        roadmap.append(messages['ci_pipeline'])
+
+    if score >= 60:
+        roadmap.append(messages['pre_commit_hooks'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    if score >= 70:
+        roadmap.append(messages['continuous_deployment'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Code quality improvements
+    if breakdown['quality'] < 18:
+        roadmap.append(messages['readability'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    if len(metrics['languages']) == 1 and metrics['file_count'] < 10:
+        roadmap.append(messages['project_config'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Documentation beyond README
+    if score >= 40 and metrics['readme_size'] > 500:
+        roadmap.append(messages['code_docs'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+        roadmap.append(messages['contributing_guide'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Version control improvements
+    if breakdown['version_control'] < 10:
+        roadmap.append(messages['issues_disabled'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+        roadmap.append(messages['pull_requests'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Performance and optimization
+    if score >= 70 and breakdown['quality'] >= 15:
+        roadmap.append(messages['performance'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Community and visibility
+    if metrics['stars'] == 0 and score >= 60:
+        roadmap.append(messages['visibility'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Advanced improvements for high-scoring repos
+    if score >= 80:
+        roadmap.append(messages['docs_site'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+        roadmap.append(messages['examples'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # Security
+    if score >= 50 and not metrics['has_gitignore']:
+        roadmap.append(messages['security'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+
+    # If repo is excellent, focus on maintenance and growth
+    if score >= 90:
+        roadmap.append(messages['maintain_quality'])
+        if len(roadmap) >= ROADMAP_LIMIT:
+            return summary, roadmap
+        roadmap.append(messages['scale_impact'])
+
+    return summary, roadmap or list(FALLBACK_ROADMAP)
+
+
+def roadmap_ids(roadmap):
+    """ROADMAP_TEMPLATES ids of a roadmap's items"""
+    return [ROADMAP_IDS[item] for item in roadmap]
@@ -0,0 +1,112 @@
+"""Declarative file-listing rules used by analyze_repository.
+
+Each rule names a signal, which form of the entry name it inspects (`name` as
+listed or its `lower` case), how it matches (`equals`, `prefix`, `contains`)
+and the patterns, plus an optional entry field captured from the first match.
+The table is compiled once at import into substring needles that are searched
+for in the whole listing joined into a single NUL-delimited string, so each
+rule costs one C-level scan instead of a Python loop over the entries (plain
+substring search beats the regex engine here). NUL cannot occur in a git path,
+so `\0name\0` matches exactly one whole entry and a match never straddles two.
+
+Deep analysis doesn't reuse the root listing's substring test rule, since
+across a whole tree 'test' or 'spec' turns up in almost any name (latest/,
+inspector.py). It matches whole path segments against TREE_TEST_DIRS and
+TREE_TEST_FILE instead.
+"""
+import re
+
+CONFIG_FILES = ('.eslintrc', '.prettierrc', 'tsconfig.json', 'pytest.ini', 'setup.py', 'requirements.txt', 'package.json')
+COMMON_FOLDERS = ('src', 'tests', 'docs', 'lib', 'config', 'public', 'assets')
+
+# (signal, key, match, patterns, capture as (metric, entry field) or None)
+LISTING_RULES = (
+    ('has_readme', 'lower', 'equals', ('readme.md',), ('readme_size', 'size')),
+    ('has_license', 'lower', 'prefix', ('license',), None),
+    ('has_contributing', 'lower', 'equals', ('contributing.md', 'contributing.rst'), None),
+    ('has_tests', 'lower', 'contains', ('test', 'spec'), None),
+    ('has_config', 'name', 'contains', CONFIG_FILES, None),
+    ('has_gitignore', 'name', 'equals', ('.gitignore',), None),
+)
+
+# Deep analysis: test directories and test file naming conventions, matched per path segment
+TREE_TEST_DIRS = ('test', 'tests', '__tests__', 'spec')
+TREE_TEST_FILE = re.compile(r'^test_.+\.py$|_test\.(?:py|go)$|_spec\.rb$|\.(?:test|spec)\.[cm]?[jt]sx?$', re.IGNORECASE)
+
+SEPARATOR = '\0'
+
+
+def rule_needles(match, patterns):
+    """Substrings of a SEPARATOR-delimited listing that satisfy one rule"""
+    if match == 'equals':
+        return tuple(f'{SEPARATOR}{pattern}{SEPARATOR}' for pattern in patterns)
+    if match == 'prefix':
+        return tuple(f'{SEPARATOR}{pattern}' for pattern in patterns)
+    if match == 'contains':
+        return tuple(patterns)
+    raise ValueError(f'Unknown match type: {match}')
+
+
+def first_position(blob, needles):
+    """Offset of the leftmost occurrence of any needle, or -1"""
+    positions = [position for position in map(blob.find, needles) if position >= 0]
+    return min(positions) if positions else -1
+
+
+class ListingClassifier:
+    """Evaluates LISTING_RULES and folder matches over a /contents listing"""
+
+    def __init__(self, rules=LISTING_RULES, folders=COMMON_FOLDERS):
+        self.rules = tuple(
+            (signal, key, rule_needles(match, patterns), capture)
+            for signal, key, match, patterns, capture in rules
+        )
+        self.folders = tuple((folder, f'{SEPARATOR}{folder}{SEPARATOR}') for folder in folders)
+        self.defaults = {signal: False for signal, *_ in rules}
+        self.defaults.update({capture[0]: 0 for *_, capture in rules if capture})
+
+    def classify(self, contents):
+        """Return the listing signals analyze_repository scores on"""
+        signals = dict(self.defaults)
+        names = [file.get('name', '') for file in contents]
+        blobs = {
+            'name': SEPARATOR + SEPARATOR.join(names) + SEPARATOR,
+            'lower': SEPARATOR + SEPARATOR.join([name.lower() for name in names]) + SEPARATOR,
+        }
+
+        for signal, key, needles, capture in self.rules:
+            position = first_position(blobs[key], needles)
+            if position >= 0:
+                signals[signal] = True
+                if capture:
+                    index = entry_index(blobs[key], position)
+                    signals[capture[0]] = contents[index].get(capture[1], 0)
+
+        signals['file_count'] = len(contents)
+        signals['structure_matches'] = self._count_folders(contents, blobs['lower'])
+        return signals
+
+    def _count_folders(self, contents, lower_blob):
+        """How many common folder names are present as directories (a same-named file doesn't count)"""
+        count = 0
+        for folder, needle in self.folders:
+            position = lower_blob.find(needle)
+            while position >= 0:
+                if contents[entry_index(lower_blob, position)].get('type') == 'dir':
+                    count += 1
+                    break
+                position = lower_blob.find(needle, position + 1)
+        return count
+
+
+def entry_index(blob, position):
+    """Index of the entry a match at `position` belongs to"""
+    # The entry starts after the last separator at or before `position`
+    return blob.count(SEPARATOR, 0, position + 1) - 1
+
+
+LISTING_CLASSIFIER = ListingClassifier()
+
+
+def classify_listing(contents):
+    return LISTING_CLASSIFIER.classify(contents)
@@ -0,0 +1,150 @@
+"""Startup-optimized WSGI entry point for serverless deployment.
+
+Short-lived containers pay for every import on their first request, so this
+module loads only the analysis pipeline (analysis.py): /api/analyze,
+/api/roadmap/templates and /api/health are served here without Flask, and
+the Flask app is imported the first time any other route is requested.
+requests is imported by the first GitHub call, or ahead of it by warm_up(),
+which also opens keep-alive connections to the GitHub API. With
+SERVERLESS_WARM_UP on (the default) warm-up starts in a background thread at
+import, overlapping the platform's init phase instead of the first request.
+
+Point any WSGI adapter at serverless:app, or check it locally with
+
+    python serverless.py
+
+Keep the import within budget with python benchmarks/bench_cold_start.py.
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qs
+
+import analysis
+import github_client
+import metrics
+from rate_limiter import RateLimitError
+
+SERVERLESS_PORT = int(os.environ.get('SERVERLESS_PORT', '5000'))
+WARM_UP = os.environ.get('SERVERLESS_WARM_UP', '1').lower() not in ('0', 'false', 'no')
+# Connections opened by warm_up(); one analysis fetches about this many endpoints at once
+WARM_UP_CONNECTIONS = int(os.environ.get('SERVERLESS_WARM_UP_CONNECTIONS', '4'))
+
+STATUS_LINES = {200: '200 OK', 304: '304 Not Modified', 400: '400 Bad Request', 429: '429 Too Many Requests'}
+# Matches flask-cors' defaults, like asgi.py
+CORS_HEADERS = [('Access-Control-Allow-Origin', '*')]
+TRACE_ENVIRON_KEY = 'HTTP_' + metrics.TRACE_HEADER.upper().replace('-', '_')
+
+
+def warm_up(connections=WARM_UP_CONNECTIONS):
+    """Import the HTTP stack and open `connections` keep-alive connections to the GitHub API
+
+    Requests /rate_limit, which costs no quota and tells the token pool how
+    much each token has left. Returns False if GitHub couldn't be reached.
+    """
+    import requests
+
+    url = f'{github_client.GITHUB_API_URL}/rate_limit'
+    # Concurrent requests each take their own connection from the session's pool
+    futures = [github_client.submit(github_client.github_get, url) for _ in range(connections)]
+    for future in futures:
+        try:
+            future.result()
+        except (requests.RequestException, RateLimitError) as e:
+            print(f"Warm-up request to GitHub failed: {e}")
+            return False
+    return True
+
+
+def json_response(payload, status=200, headers=()):
+    return status, [('Content-Type', 'application/json'), *headers], analysis.dump_json(payload)
+
+
+def request_data(environ):
+    """Query parameters for GET, the JSON body otherwise; None if the body isn't a JSON object"""
+    if environ['REQUEST_METHOD'] == 'GET':
+        return {name: values[0] for name, values in parse_qs(environ.get('QUERY_STRING', '')).items()}
+    try:
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        data = json.loads(environ['wsgi.input'].read(length) or b'null')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def analyze(environ):
+    data = request_data(environ)
+    if data is None:
+        return json_response({'error': 'Request body must be a JSON object'}, 400)
+    try:
+        repo_url, deep, shape = analysis.analysis_params(data)
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    if not repo_url:
+        return json_response({'error': 'Repository URL is required'}, 400)
+
+    try:
+        key, result = analysis.keyed_analysis(repo_url, deep)
+    except RateLimitError as e:
+        return json_response(analysis.rate_limit_error(e), 429, [('Retry-After', str(e.retry_after))])
+    if not result:
+        return json_response({'error': analysis.FETCH_FAILED_MESSAGE}, 400)
+
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH', '') if environ['REQUEST_METHOD'] == 'GET' else ''
+    return analysis.render_analysis(key, result, shape, environ.get('HTTP_ACCEPT_ENCODING', ''), if_none_match)
+
+
+def roadmap_templates(environ):
+    version = parse_qs(environ.get('QUERY_STRING', '')).get('v', [None])[0]
+    return analysis.templates_response(version, environ.get('HTTP_ACCEPT_ENCODING', ''),
+                                       environ.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def health(environ):
+    # Background jobs belong to the Flask app; a serverless container doesn't run them
+    return json_response({'status': 'ok', 'message': 'Repository Mirror API is running', **analysis.cache_status()})
+
+
+ROUTES = {
+    ('GET', '/api/analyze'): analyze,
+    ('POST', '/api/analyze'): analyze,
+    ('GET', analysis.ROADMAP_TEMPLATES_PATH): roadmap_templates,
+    ('GET', '/api/health'): health,
+}
+
+
+def app(environ, start_response):
+    """WSGI callable: routes in ROUTES natively, everything else through the Flask app"""
+    handler = ROUTES.get((environ['REQUEST_METHOD'], environ.get('PATH_INFO', '')))
+    if handler is None:
+        import app as flask_app
+
+        return flask_app.app(environ, start_response)
+
+    started = time.perf_counter()
+    trace_token = metrics.start_trace() if metrics.trace_requested(environ.get(TRACE_ENVIRON_KEY)) else None
+    try:
+        status, headers, body = handler(environ)
+        if trace_token is not None:
+            headers.append(('Server-Timing', metrics.current_trace().server_timing()))
+    finally:
+        if trace_token is not None:
+            metrics.end_trace(trace_token)
+    metrics.record_response(environ['PATH_INFO'], status, time.perf_counter() - started, len(body))
+
+    if status != 304:
+        headers.append(('Content-Length', str(len(body))))
+    start_response(STATUS_LINES[status], headers + CORS_HEADERS)
+    return [body]
+
+
+if WARM_UP:
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+
+if __name__ == '__main__':
+    from wsgiref.simple_server import make_server
+
+    print(f"Serving on http://127.0.0.1:{SERVERLESS_PORT}")
+    make_server('', SERVERLESS_PORT, app).serve_forever()
@@ -0,0 +1,184 @@
+"""Per-repository snapshots that let re-analysis fetch only what changed.
+
+After each REST fetch the aggregates analyze_repository needs are stored with
+the HEAD they were computed at: the recent commit window and commit count,
+the root listing (name, type and size are all the scorer reads), languages
+and branch count. The next fetch lists the current HEAD commit: if it is the
+snapshot HEAD, the listing and languages are reused as they are. Otherwise a
+CommitChain follows single parents from HEAD down to the old HEAD (one page of
+commits newer than the old HEAD, `since=`, when HEAD's own parent isn't it)
+and the new commits are stacked on the stored window. A merge commit, a
+force-push or a commit dated before the old HEAD (which `since=` leaves out)
+breaks the chain; the full fetch that follows keeps the commits already
+listed, since they are exactly the start of the current history.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from aggregates import CommitStats
+from github_graphql import ENTRY_TYPES
+
+INCREMENTAL_ANALYSIS = os.environ.get('ANALYSIS_INCREMENTAL', '1').lower() not in ('0', 'false', 'no')
+SNAPSHOT_CACHE_SIZE = int(os.environ.get('ANALYSIS_SNAPSHOT_SIZE', '4096'))
+SNAPSHOT_PATH = os.environ.get('ANALYSIS_SNAPSHOT_PATH', '')
+
+
+class RepoSnapshot:
+    __slots__ = ('head_sha', 'head_committed_at', 'commit_count', 'recent', 'listing', 'languages',
+                 'branch_count', 'stored_at')
+
+    def __init__(self, head_sha, head_committed_at, commit_count, recent, listing, languages, branch_count,
+                 stored_at=None):
+        self.head_sha = head_sha
+        self.head_committed_at = head_committed_at
+        self.commit_count = commit_count
+        self.recent = recent
+        self.listing = listing
+        self.languages = languages
+        self.branch_count = branch_count
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    @classmethod
+    def from_data(cls, github_data):
+        """Snapshot a fetch result, or None if it has no commits to anchor on"""
+        stats = github_data['commit_stats']
+        if not stats.recent or not stats.recent[0][0] or not stats.head_committed_at:
+            return None
+        return cls(stats.recent[0][0], stats.head_committed_at, stats.count, [list(entry) for entry in stats.recent],
+                   project_listing(github_data['contents']), github_data['languages'], len(github_data['branches']))
+
+    def commit_stats(self):
+        return CommitStats.from_recent(self.commit_count, [tuple(entry) for entry in self.recent],
+                                       self.head_committed_at)
+
+    def to_json(self):
+        return json.dumps({name: getattr(self, name) for name in self.__slots__})
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(**json.loads(text))
+
+
+def project_listing(contents):
+    """The fields of a root listing the scorer reads"""
+    return [{'name': entry.get('name', ''), 'type': entry.get('type'), 'size': entry.get('size', 0)}
+            for entry in contents]
+
+
+def listing_from_tree(tree):
+    """Root listing in /contents form from a non-recursive git tree response"""
+    return [{'name': entry['path'], 'type': ENTRY_TYPES.get(entry.get('type'), entry.get('type')),
+             'size': entry.get('size', 0)}
+            for entry in tree.get('tree') or []]
+
+
+class CommitChain:
+    """Single-parent chain of commits from the current HEAD down to a snapshot's HEAD
+
+    Fed newest-first listings, it keeps each commit that is the previous
+    one's only parent. It is `complete` once the next parent is the snapshot
+    HEAD: its commits are then exactly the ones landed on top of the snapshot.
+    It stops early at a merge commit, at a commit that isn't the expected
+    parent, or after `limit` commits. What it holds is still the start of the
+    current history, so a full fetch can continue from `next_sha`.
+    """
+    __slots__ = ('snapshot', 'limit', 'commits', 'next_sha', 'complete', 'stopped')
+
+    def __init__(self, snapshot, head_sha, limit):
+        self.snapshot = snapshot
+        self.limit = limit
+        self.commits = []
+        # None until the first listing says which commit HEAD is
+        self.next_sha = head_sha
+        self.complete = self.stopped = head_sha == snapshot.head_sha
+
+    def extend(self, commits):
+        for commit in commits:
+            if self.stopped:
+                return
+            sha = commit.get('sha')
+            if self.next_sha is not None and sha != self.next_sha:
+                # Listed out of order, or skipped by since= (committed before the old HEAD)
+                self.stopped = True
+            elif sha == self.snapshot.head_sha:
+                # HEAD hasn't moved
+                self.complete = self.stopped = True
+            elif len(commit.get('parents') or []) != 1:
+                self.next_sha = sha
+                self.stopped = True
+            else:
+                self.commits.append(commit)
+                self.next_sha = commit['parents'][0].get('sha')
+                self.complete = self.next_sha == self.snapshot.head_sha
+                self.stopped = self.complete or len(self.commits) >= self.limit
+
+    def wants_more(self):
+        """Whether listing on from next_sha could still complete the chain"""
+        return not self.stopped and bool(self.commits)
+
+    def ends_at(self, commit):
+        """paginate's `until`: no commit listed after this one can extend the chain"""
+        parents = commit.get('parents') or []
+        return (commit.get('sha') == self.snapshot.head_sha or len(parents) != 1
+                or parents[0].get('sha') == self.snapshot.head_sha)
+
+
+class SnapshotStore:
+    """LRU of RepoSnapshots keyed by owner/repo, optionally backed by sqlite"""
+
+    def __init__(self, max_entries=SNAPSHOT_CACHE_SIZE, path=SNAPSHOT_PATH):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            import sqlite3
+
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, body TEXT, stored_at REAL)')
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(owner, repo):
+        return f'{owner.lower()}/{repo.lower()}'
+
+    def get(self, owner, repo):
+        key = self.make_key(owner, repo)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                return snapshot
+            if self._conn is None:
+                return None
+            row = self._conn.execute('SELECT body FROM snapshots WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            snapshot = RepoSnapshot.from_json(row[0])
+            self._remember(key, snapshot)
+            return snapshot
+
+    def put(self, owner, repo, snapshot):
+        key = self.make_key(owner, repo)
+        with self._lock:
+            self._remember(key, snapshot)
+            if self._conn is not None:
+                self._conn.execute('INSERT OR REPLACE INTO snapshots (key, body, stored_at) VALUES (?, ?, ?)',
+                                   (key, snapshot.to_json(), snapshot.stored_at))
+                self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM snapshots')
+                self._conn.commit()
+
+    def _remember(self, key, snapshot):
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
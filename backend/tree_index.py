@@ -0,0 +1,210 @@
+"""Whole-repository path index built from the git trees API.
+
+The recursive tree of a large repository can hold 100k+ entries and tens of
+megabytes of JSON, so the response is never parsed as a whole: entries are
+decoded one at a time from the HTTP stream and folded into a PathIndex, which
+keeps each path as (parent, interned name segment, kind, size) in typed
+arrays. Indexing stops at DEEP_TREE_MAX_ENTRIES, which bounds memory no
+matter how big the repository is.
+"""
+import codecs
+import json
+import os
+import re
+from array import array
+
+from scoring_rules import LISTING_CLASSIFIER, TREE_TEST_DIRS, TREE_TEST_FILE
+
+DEEP_TREE_MAX_ENTRIES = int(os.environ.get('DEEP_TREE_MAX_ENTRIES', '250000'))
+
+KIND_BLOB, KIND_TREE, KIND_COMMIT = 0, 1, 2
+KINDS = {'blob': KIND_BLOB, 'tree': KIND_TREE, 'commit': KIND_COMMIT}
+KIND_NAMES = {kind: name for name, kind in KINDS.items()}
+
+# Where GitHub recognizes a contributing guide besides the repository root
+CONTRIBUTING_DIRS = ('', '.github', 'docs')
+CONTRIBUTING_NAMES = ('contributing.md', 'contributing.rst')
+
+TREE_ARRAY = re.compile(r'"tree"\s*:\s*\[')
+TRUNCATED_FLAG = re.compile(r'"truncated"\s*:\s*(true|false)')
+
+
+class PathRecord:
+    __slots__ = ('path', 'kind', 'size')
+
+    def __init__(self, path, kind, size):
+        self.path = path
+        self.kind = kind
+        self.size = size
+
+    def __repr__(self):
+        return f'PathRecord({self.path!r}, {self.kind!r}, {self.size})'
+
+
+class PathIndex:
+    """Array-backed index of tree paths with interned name segments"""
+    __slots__ = ('segments', 'segment_ids', 'dir_ids', 'parents', 'names', 'kinds', 'sizes', 'truncated')
+
+    def __init__(self):
+        self.segments = []
+        self.segment_ids = {}
+        self.dir_ids = {}
+        self.parents = array('i')
+        self.names = array('i')
+        self.kinds = array('b')
+        self.sizes = array('q')
+        self.truncated = False
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, path, kind, size=0):
+        """Append one tree entry; parents must be added before their children"""
+        parent_path, _, name = path.rpartition('/')
+        segment = self.segment_ids.get(name)
+        if segment is None:
+            segment = self.segment_ids[name] = len(self.segments)
+            self.segments.append(name)
+        entry_id = len(self.names)
+        self.parents.append(self.dir_ids.get(parent_path, -1) if parent_path else -1)
+        self.names.append(segment)
+        self.kinds.append(KINDS.get(kind, KIND_BLOB))
+        self.sizes.append(size or 0)
+        if kind == 'tree':
+            self.dir_ids[path] = entry_id
+        return entry_id
+
+    def path(self, entry_id):
+        parts = []
+        while entry_id >= 0:
+            parts.append(self.segments[self.names[entry_id]])
+            entry_id = self.parents[entry_id]
+        return '/'.join(reversed(parts))
+
+    def records(self):
+        for entry_id in range(len(self.names)):
+            yield PathRecord(self.path(entry_id), KIND_NAMES[self.kinds[entry_id]], self.sizes[entry_id])
+
+    def memory_bytes(self):
+        """Approximate footprint of the index (arrays plus interned segment strings)"""
+        arrays = sum(column.itemsize * len(column) for column in (self.parents, self.names, self.kinds, self.sizes))
+        segments = sum(len(segment) + 49 for segment in self.segments)
+        return arrays + segments + 100 * (len(self.segment_ids) + len(self.dir_ids))
+
+
+def iter_tree_items(chunks, result):
+    """Yield the objects of the `tree` array of a git trees response, decoding incrementally
+
+    `chunks` is an iterable of raw bytes (e.g. Response.iter_content). Once the
+    array is exhausted, result['truncated'] is set from the response body.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+
+    def more():
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError('Unexpected end of git tree response')
+        return text.decode(chunk)
+
+    while True:
+        match = TREE_ARRAY.search(buffer)
+        if match:
+            head, buffer = buffer[:match.start()], buffer[match.end():]
+            break
+        buffer += more()
+
+    position = 0
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(buffer):
+            buffer, position = more(), 0
+            continue
+        if buffer[position] == ']':
+            position += 1
+            break
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Entry split across chunks: keep the unread tail and append the next chunk
+            buffer, position = buffer[position:] + more(), 0
+            continue
+        yield item
+        position = end
+
+    tail = buffer[position:] + ''.join(text.decode(chunk) for chunk in chunks) + text.decode(b'', final=True)
+    flag = TRUNCATED_FLAG.search(tail) or TRUNCATED_FLAG.search(head)
+    result['truncated'] = bool(flag and flag.group(1) == 'true')
+
+
+def build_index(chunks, max_entries=DEEP_TREE_MAX_ENTRIES):
+    """Stream a git trees response into a PathIndex of at most `max_entries` entries"""
+    index = PathIndex()
+    result = {}
+    items = iter_tree_items(chunks, result)
+    for item in items:
+        if len(index) >= max_entries:
+            index.truncated = True
+            items.close()
+            break
+        index.add(item['path'], item.get('type'), item.get('size'))
+    index.truncated = index.truncated or result.get('truncated', False)
+    return index
+
+
+def tree_signals(index, classifier=LISTING_CLASSIFIER):
+    """Test, config, docs and structure signals over every path in the tree
+
+    Name-based rules only look at the last path segment, so classifying each
+    distinct segment once covers the whole tree.
+    """
+    names = classifier.classify([{'name': segment} for segment in index.segments])
+    dir_segments = {index.names[entry_id] for entry_id in index.dir_ids.values()}
+    folders = classifier.classify([{'name': index.segments[segment], 'type': 'dir'} for segment in dir_segments])
+
+    contributing_segments = {
+        segment_id for segment, segment_id in index.segment_ids.items() if segment.lower() in CONTRIBUTING_NAMES
+    }
+    has_contributing = False
+    if contributing_segments:
+        for entry_id, segment in enumerate(index.names):
+            if segment in contributing_segments:
+                parent = index.parents[entry_id]
+                if (index.path(parent) if parent >= 0 else '').lower() in CONTRIBUTING_DIRS:
+                    has_contributing = True
+                    break
+
+    return {
+        'has_tests': has_test_paths(index, dir_segments),
+        'has_config': names['has_config'],
+        'has_contributing': has_contributing,
+        'structure_matches': folders['structure_matches'],
+        'tree_entries': len(index),
+        'tree_truncated': index.truncated,
+    }
+
+
+def has_test_paths(index, dir_segments):
+    """Whether a directory named like TREE_TEST_DIRS or a file named like TREE_TEST_FILE is in the tree"""
+    if any(index.segments[segment].lower() in TREE_TEST_DIRS for segment in dir_segments):
+        return True
+    test_files = {segment_id for segment, segment_id in index.segment_ids.items() if TREE_TEST_FILE.search(segment)}
+    if not test_files:
+        return False
+    return any(segment in test_files and kind == KIND_BLOB for segment, kind in zip(index.names, index.kinds))
+
+
+def merge_signals(listing, deep):
+    """Combine root-listing signals with whole-tree ones
+
+    Signals only ever turn on, so a truncated tree can add evidence found in
+    the part that was read but never hide what the root listing shows.
+    """
+    merged = dict(listing)
+    for signal in ('has_tests', 'has_config', 'has_contributing'):
+        merged[signal] = listing[signal] or deep[signal]
+    merged['structure_matches'] = max(listing['structure_matches'], deep['structure_matches'])
+    return merged
@@ -2,6 +2,17 @@ import { useState } from 'react'
 import axios from 'axios'
 import './App.css'
 
+// Roadmap texts by id, fetched once per templates version and reused for every analysis
+const roadmapTemplates = {}
+
+const loadRoadmapTemplates = (url) => {
+  if (!roadmapTemplates[url]) {
+    roadmapTemplates[url] = axios.get(url).then((response) => response.data.templates)
+    roadmapTemplates[url].catch(() => delete roadmapTemplates[url])
+  }
+  return roadmapTemplates[url]
+}
+
 function App() {
   const [repoUrl, setRepoUrl] = useState('')
   const [loading, setLoading] = useState(false)
@@ -19,10 +30,12 @@ function App() {
     setResult(null)
 
     try {
-      const response = await axios.post('/api/analyze', {
-        repo_url: repoUrl
+      // GET so the browser keeps the response and revalidates it with its ETag
+      const response = await axios.get('/api/analyze', {
+        params: { repo_url: repoUrl, shape: 'compact' }
       })
-      setResult(response.data)
+      const templates = await loadRoadmapTemplates(response.data.roadmap_templates)
+      setResult({ ...response.data, roadmap: response.data.roadmap.map((id) => templates[id]) })
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to analyze repository. Please check the URL and try again.')
     } finally {